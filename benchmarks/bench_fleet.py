@@ -0,0 +1,201 @@
+# Benchmark suite against a mock fleet (benchmarks/mock_fleet.py, started as a subprocess so its
+# CPU time is not counted): sweep latency, CPU per poll, memory per node and the cost of applying
+# one sweep of changes to the GUI in both table modes. Results are written as JSON, pass an older
+# result file with --compare to print the difference.
+# Run from the project root: python benchmarks/bench_fleet.py --sizes 10,100,1000
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS, ".."))
+
+import summary
+from nodes import NodeManager
+
+# Metrics compared by --compare, lower is better for all of them
+COMPARED = ["cold_sweep_ms", "sweep_p50_ms", "sweep_p95_ms", "cpu_per_poll_us", "memory_per_node_kb", "ui_grid_ms", "ui_compact_ms"]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def version_label():
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], cwd=BENCHMARKS, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unversioned"
+
+@contextlib.contextmanager
+def mock_fleet(args, count, config):
+    command = [
+        sys.executable, os.path.join(BENCHMARKS, "mock_fleet.py"), "--nodes", str(count), "--base-port", str(args.base_port),
+        "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+        "--timeout-rate", str(args.timeout_rate), "--hang", str(args.hang), "--padding", str(args.padding),
+        "--write-config", config
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        line = process.stdout.readline()
+        if not line.startswith("ready"):
+            raise SystemExit(f"Mock fleet failed to start: {line.strip()}")
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+def open_manager(args, config):
+    return NodeManager(config, max_in_flight=args.max_in_flight, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+
+def close_manager(manager):
+    # Flushes config, state and history while the temporary directory still exists
+    manager.close()
+
+def measure_memory(args, config, count):
+    # Everything allocated for the fleet after two sweeps: nodes, snapshots, history, connections
+    tracemalloc.start()
+    manager = open_manager(args, config)
+    manager.refresh_all()
+    manager.refresh_all()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    close_manager(manager)
+    return current / count / 1024
+
+def measure_sweeps(args, config, count):
+    manager = open_manager(args, config)
+    # The first sweep also opens every connection and resolves every host
+    cold = manager.refresh_all()
+    durations = []
+    online = []
+    cpu = 0
+    for _ in range(args.sweeps):
+        started = time.process_time()
+        result = manager.refresh_all()
+        cpu += time.process_time() - started
+        durations.append(result["duration"])
+        online.append(result["online"])
+    close_manager(manager)
+    return {
+        "cold_sweep_ms": cold["duration"] * 1000,
+        "sweep_p50_ms": percentile(durations, 0.5) * 1000,
+        "sweep_p95_ms": percentile(durations, 0.95) * 1000,
+        "sweep_max_ms": max(durations) * 1000,
+        "cpu_per_poll_us": cpu / (args.sweeps * count) * 1e6,
+        "online_min": min(online),
+        "connections": cold["connections"]
+    }
+
+def measure_ui(args, root, config, compact):
+    # Time to apply one sweep worth of queued changes on the Tk main loop
+    from main import MainGUI
+    gui = MainGUI(root, filename=config, autostart=False)
+    gui.virtual_table.set(compact)
+    gui.show_table()
+    gui.node_manager.refresh_all()
+    gui.drain_updates()
+    root.update()
+    timings = []
+    for _ in range(args.sweeps):
+        gui.node_manager.refresh_all()
+        started = time.perf_counter()
+        gui.drain_updates()
+        root.update()
+        timings.append(time.perf_counter() - started)
+    for widget in (gui.summary_label, gui.frame, gui.tree_view.frame):
+        widget.destroy()
+    close_manager(gui.node_manager)
+    return percentile(timings, 0.5) * 1000
+
+def run(args):
+    root = None
+    if not args.no_ui:
+        import tkinter as tk
+        try:
+            root = tk.Tk()
+            root.withdraw()
+        except tk.TclError as e:
+            print(f"Skipping UI refresh cost: {e}", file=sys.stderr)
+
+    results = []
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = os.path.join(tmp, "config.json")
+            # Node polls print a line each, keep them out of the report
+            with mock_fleet(args, count, config), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = {"nodes": count}
+                result.update(measure_sweeps(args, config, count))
+                result["memory_per_node_kb"] = measure_memory(args, config, count)
+                if root is not None:
+                    result["ui_grid_ms"] = measure_ui(args, root, config, compact=False) if count <= args.max_grid else None
+                    result["ui_compact_ms"] = measure_ui(args, root, config, compact=True)
+            results.append(result)
+            print(f"{count:>6} nodes: sweep {result['sweep_p50_ms']:.1f} ms (p95 {result['sweep_p95_ms']:.1f}, cold {result['cold_sweep_ms']:.1f}), "
+                  f"{result['cpu_per_poll_us']:.0f} us CPU/poll, {result['memory_per_node_kb']:.1f} KiB/node"
+                  + (f", UI {result.get('ui_grid_ms') or float('nan'):.1f} / {result['ui_compact_ms']:.1f} ms (grid / compact)" if root is not None else ""),
+                  file=sys.stderr)
+    if root is not None:
+        root.destroy()
+
+    return {
+        "label": args.label or version_label(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "orjson": summary.orjson is not None,
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results
+    }
+
+def compare(old, new):
+    print(f"{'nodes':>6} {'metric':<20} {old['label']:>14} {new['label']:>14} {'change':>8}")
+    previous = {result["nodes"]: result for result in old["results"]}
+    for result in new["results"]:
+        before = previous.get(result["nodes"])
+        if before is None:
+            continue
+        for metric in COMPARED:
+            if before.get(metric) is None or result.get(metric) is None:
+                continue
+            change = (result[metric] - before[metric]) / before[metric] if before[metric] else 0
+            print(f"{result['nodes']:>6} {metric:<20} {before[metric]:>14.2f} {result[metric]:>14.2f} {change:>+8.0%}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fleet-scale benchmarks against a mock xmrig fleet")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[10, 100, 1000], help="fleet sizes (default: 10,100,1000)")
+    parser.add_argument("--sweeps", type=int, default=5, help="measured sweeps per size (default: 5)")
+    parser.add_argument("--base-port", type=int, default=20000, help="first port of the mock fleet (default: 20000)")
+    parser.add_argument("--latency", type=float, default=0, help="mock response latency in milliseconds (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random mock latency in milliseconds (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of mock responses that are HTTP 500 (default: 0)")
+    parser.add_argument("--timeout-rate", type=float, default=0, help="fraction of mock requests that hang (default: 0)")
+    parser.add_argument("--hang", type=float, default=30, help="seconds a hanging mock request waits (default: 30)")
+    parser.add_argument("--padding", type=int, default=0, help="extra bytes per summary payload (default: 0)")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="NodeManager concurrency (default: 32)")
+    parser.add_argument("--connect-timeout", type=float, default=3, help="NodeManager connect timeout (default: 3)")
+    parser.add_argument("--read-timeout", type=float, default=5, help="NodeManager read timeout (default: 5)")
+    parser.add_argument("--max-grid", type=int, default=1000, help="skip the widget grid above this many nodes (default: 1000)")
+    parser.add_argument("--no-ui", action="store_true", help="skip the UI refresh measurements")
+    parser.add_argument("--label", help="name of this run in the results (default: git describe)")
+    parser.add_argument("-o", "--output", help="result file (default: benchmarks/results/fleet-<label>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+    output = args.output or os.path.join(BENCHMARKS, "results", f"fleet-{report['label']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"Results written to {output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), report)
@@ -0,0 +1,40 @@
+# Benchmark: memory of slotted Node vs a plain __dict__ Node
+# Run from the project root: python benchmarks/bench_node_table.py
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from nodes import Node
+
+SIZES = [1000, 10000]
+
+# Same constructor and snapshot, but a regular class with a per-instance __dict__
+DictNode = type("DictNode", (), {"__init__": Node.__init__, "snapshot": Node.snapshot})
+
+def make_nodes(cls, count):
+    random.seed(1)
+    nodes = []
+    for i in range(count):
+        node = cls(i + 1, f"rig-{i + 1:05d}.local", 8080)
+        node.online = random.random() > 0.1
+        node.hashrate_10s = random.uniform(1000, 20000) if node.online else 0
+        node.algo = random.choice(["rx/0", "rx/wow", "gr"])
+        nodes.append(node)
+    return nodes
+
+def measure_memory(cls, count):
+    tracemalloc.start()
+    nodes = make_nodes(cls, count)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / count, nodes
+
+if __name__ == "__main__":
+    print(f"{'nodes':>6} {'dict B/node':>12} {'slots B/node':>13}")
+    for count in SIZES:
+        dict_bytes, _ = measure_memory(DictNode, count)
+        slot_bytes, _ = measure_memory(Node, count)
+        print(f"{count:>6} {dict_bytes:>12.0f} {slot_bytes:>13.0f}")
@@ -0,0 +1,52 @@
+# Benchmark: decode time per node per poll for recorded /2/summary payloads, comparing the
+# old response.json() + chained .get() path with summary.decode_summary (stdlib and orjson)
+# Run from the project root: python benchmarks/bench_summary_decode.py
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import summary
+from summary import decode_summary
+
+ROUNDS = 2000
+PAYLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads", "summary_*.json")
+
+def legacy_decode(body):
+    # What Node.update_node did before the dedicated decoder
+    res = json.loads(body)
+    return (
+        res.get("worker_id", "No Title"), res.get("ua", "Unknown"), res.get("uptime", 0), res.get("algo", "Unknown"),
+        res.get("connection", {}).get("pool", "Unknown"), res.get("connection", {}).get("ping", 0),
+        res.get("connection", {}).get("failures", 0), res.get("connection", {}).get("diff", 0),
+        res.get("hashrate", {}).get("total", [])[0], res.get("hashrate", {}).get("total", [])[1],
+        res.get("hashrate", {}).get("total", [])[2], res.get("hashrate", {}).get("highest", 0),
+        res.get("cpu", {}).get("brand", "Unknown"), res.get("cpu", {}).get("cores", 0), res.get("cpu", {}).get("threads", 0),
+        res.get("resources", {}).get("memory", {}).get("free", 0), res.get("resources", {}).get("memory", {}).get("total", 0),
+        res.get("results", {}).get("shares_good", 0), res.get("results", {}).get("shares_total", 0), res.get("results", {}).get("avg_time", 0)
+    )
+
+def timed(function, body):
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            function(body)
+        best = min(best, time.perf_counter() - started)
+    return best / ROUNDS * 1e6
+
+if __name__ == "__main__":
+    backend = summary.orjson
+    print(f"{'payload':<22} {'bytes':>7} {'legacy us':>10} {'stdlib us':>10} {'orjson us':>10}")
+    for path in sorted(glob.glob(PAYLOADS)):
+        with open(path, "rb") as file:
+            body = file.read()
+        legacy = timed(legacy_decode, body)
+        summary.orjson = None
+        stdlib = timed(decode_summary, body)
+        summary.orjson = backend
+        fast = timed(decode_summary, body) if backend is not None else float("nan")
+        print(f"{os.path.basename(path):<22} {len(body):>7} {legacy:>10.1f} {stdlib:>10.1f} {fast:>10.1f}")
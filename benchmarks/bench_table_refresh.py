@@ -0,0 +1,92 @@
+# Benchmark: cost of one table refresh in MainGUI at 10, 100 and 1000 synthetic nodes, in both table modes
+# Run from the project root: python benchmarks/bench_table_refresh.py (needs a display)
+import json
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import MainGUI
+
+SIZES = [10, 100, 1000]
+ROUNDS = 5
+
+def write_config(path, count):
+    nodes = [{"id": i + 1, "host": f"rig-{i + 1:04d}.local", "port": 8080} for i in range(count)]
+    with open(path, "w") as file:
+        json.dump({"nodes": nodes}, file)
+
+def fill_nodes(nodes, tick):
+    for i, node in enumerate(nodes):
+        node.online = True
+        node.name = f"rig-{i + 1:04d}"
+        node.cpu_name = "AMD Ryzen 9 7950X 16-Core Processor"
+        node.cores = 16
+        node.threads = 32
+        node.memory_free = 8 * 1024 ** 3
+        node.memory_total = 32 * 1024 ** 3
+        node.algo = "rx/0"
+        node.ua = "XMRig/6.21.0"
+        node.hashrate_10s = 10000.0 + (i + tick) % 50
+        node.hashrate_1m = 10000.0
+        node.hashrate_15m = 10000.0
+        node.shares_good = tick
+        node.shares_total = tick
+        node.avg_time = 60
+
+def render(app):
+    # Same path as the update queue: one refresh_row per node, grid cells or tree view rows depending on the mode
+    for index, node in enumerate(app.nodes):
+        app.refresh_row(index, node)
+
+def bench(root, count, compact):
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "config.json")
+        write_config(filename, count)
+        app = MainGUI(root, filename=filename, autostart=False)
+
+        # Force the mode, above VIRTUAL_TABLE_THRESHOLD the constructor picks the tree view on its own
+        started = time.perf_counter()
+        app.virtual_table.set(compact)
+        app.show_table()
+        root.update()
+        build = time.perf_counter() - started
+
+        changed = []
+        unchanged = []
+        for tick in range(ROUNDS):
+            fill_nodes(app.nodes, tick)
+            started = time.perf_counter()
+            render(app)
+            root.update()
+            changed.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            render(app)
+            root.update()
+            unchanged.append(time.perf_counter() - started)
+
+        for widget in (app.summary_label, app.frame, app.tree_view.frame):
+            widget.destroy()
+        # Flushes config and state while the temporary directory still exists
+        app.node_manager.close()
+        return {
+            "nodes": count,
+            "mode": "compact" if compact else "grid",
+            "build_ms": build * 1000,
+            "refresh_changed_ms": min(changed) * 1000,
+            "refresh_unchanged_ms": min(unchanged) * 1000
+        }
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'nodes':>6} {'mode':>8} {'build ms':>10} {'refresh ms':>11} {'unchanged ms':>13}")
+    for count in SIZES:
+        for compact in (False, True):
+            result = bench(root, count, compact)
+            print(f"{result['nodes']:>6} {result['mode']:>8} {result['build_ms']:>10.1f} {result['refresh_changed_ms']:>11.1f} {result['refresh_unchanged_ms']:>13.1f}")
+    root.destroy()
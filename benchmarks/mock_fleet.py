@@ -0,0 +1,184 @@
+# Mock xmrig fleet: one asyncio HTTP listener per port, each port behaving like one rig.
+# Replays the recorded /2/summary payloads with a moving hashrate, share count and uptime,
+# with configurable latency, error rate, hanging requests, padding and unreachable nodes.
+# Run from the project root, e.g. 1000 rigs on ports 20000-20999 plus a matching config:
+#   python benchmarks/mock_fleet.py --nodes 1000 --base-port 20000 --write-config /tmp/fleet.json
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import os
+import random
+import resource
+import threading
+import time
+
+PAYLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads", "summary_*.json")
+
+def load_payloads(pattern=PAYLOADS):
+    payloads = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path) as file:
+            payloads.append(json.load(file))
+    if not payloads:
+        raise SystemExit(f"No recorded payloads match {pattern}")
+    return payloads
+
+def raise_file_limit(needed):
+    # Every listener and every client connection is a file descriptor
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard) if hard != resource.RLIM_INFINITY else needed, hard))
+
+def write_config(path, count, base_port, host="127.0.0.1", offline=0):
+    # Unreachable nodes get ports right after the fleet, nothing listens there
+    nodes = [{"id": i + 1, "host": host, "port": base_port + i} for i in range(count + offline)]
+    with open(path, "w") as file:
+        json.dump({"nodes": nodes}, file)
+
+class MockRig:
+    def __init__(self, index, payload, stable=False, padding=0):
+        self.index = index
+        self.payload = copy.deepcopy(payload)
+        self.payload["worker_id"] = f"rig-{index + 1:04d}"
+        if padding:
+            # Stand-in for large responses (many threads, long error logs)
+            self.payload["padding"] = "x" * padding
+        self.stable = stable
+        self.started = time.time() - self.payload.get("uptime", 0)
+        self.base_hashrate = (self.payload.get("hashrate", {}).get("total") or [0])[0] or 1000.0
+        self.body = json.dumps(self.payload).encode()
+
+    def summary(self):
+        if self.stable:
+            return self.body
+        # Hashrate wanders a few percent, a share now and then, uptime keeps ticking
+        hashrate = self.payload["hashrate"]
+        hashrate["total"] = [round(self.base_hashrate * random.uniform(0.97, 1.03), 2) for _ in range(3)]
+        results = self.payload["results"]
+        if random.random() < 0.1:
+            results["shares_good"] += 1
+            results["shares_total"] += 1
+        self.payload["uptime"] = int(time.time() - self.started)
+        return json.dumps(self.payload).encode()
+
+    def backends(self):
+        total = self.payload["hashrate"]["total"]
+        threads = self.payload["hashrate"].get("threads") or []
+        return json.dumps([{
+            "type": "cpu", "enabled": True, "algo": self.payload.get("algo"), "hashrate": total,
+            "hugepages": self.payload.get("hugepages"), "msr": True, "asm": "auto", "dataset_host": True,
+            "threads": [{"affinity": cpu, "hashrate": rates} for cpu, rates in enumerate(threads)]
+        }]).encode()
+
+class MockFleet:
+    def __init__(self, count, base_port=20000, host="127.0.0.1", latency=0, jitter=0, error_rate=0, timeout_rate=0,
+                 hang=30, padding=0, stable=False, payloads=None):
+        self.count = count
+        self.base_port = base_port
+        self.host = host
+        # Seconds, every response waits latency + uniform(0, jitter)
+        self.latency = latency
+        self.jitter = jitter
+        # Fractions of requests answered with HTTP 500 or not answered for `hang` seconds
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        payloads = payloads or load_payloads()
+        self.rigs = [MockRig(i, payloads[i % len(payloads)], stable, padding) for i in range(count)]
+        self.requests = 0
+        self.loop = None
+        self.servers = []
+        self.thread = None
+
+    async def handle(self, reader, writer, rig):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ", 2)[1].decode()
+                self.requests += 1
+
+                roll = random.random()
+                hanging = roll < self.timeout_rate
+                failing = not hanging and roll < self.timeout_rate + self.error_rate
+                delay = self.hang if hanging else self.latency + random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                if failing:
+                    status, body = "500 Internal Server Error", b'{"error": "mock failure"}'
+                elif path == "/2/summary" or path == "/1/summary":
+                    status, body = "200 OK", rig.summary()
+                elif path == "/2/backends":
+                    status, body = "200 OK", rig.backends()
+                else:
+                    status, body = "404 Not Found", b'{"error": "not found"}'
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        raise_file_limit(self.count * 3 + 256)
+        for rig in self.rigs:
+            server = await asyncio.start_server(lambda reader, writer, rig=rig: self.handle(reader, writer, rig), self.host, self.base_port + rig.index)
+            self.servers.append(server)
+
+    async def shutdown(self):
+        for server in self.servers:
+            server.close()
+        self.servers = []
+
+    def start(self):
+        # Serve from a background thread, returns once every port is listening
+        ready = threading.Event()
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.serve())
+            ready.set()
+            self.loop.run_forever()
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop = None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mock xmrig fleet for load testing")
+    parser.add_argument("-n", "--nodes", type=int, default=100, help="number of mock rigs, one port each (default: 100)")
+    parser.add_argument("--base-port", type=int, default=20000, help="port of the first rig (default: 20000)")
+    parser.add_argument("--host", default="127.0.0.1", help="listen address (default: 127.0.0.1)")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds before every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random milliseconds up to this value (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with HTTP 500 (default: 0)")
+    parser.add_argument("--timeout-rate", type=float, default=0, help="fraction of requests left hanging for --hang seconds (default: 0)")
+    parser.add_argument("--hang", type=float, default=30, help="seconds a hanging request waits (default: 30)")
+    parser.add_argument("--padding", type=int, default=0, help="extra bytes added to every summary payload (default: 0)")
+    parser.add_argument("--stable", action="store_true", help="always return the recorded payload unchanged")
+    parser.add_argument("--payloads", default=PAYLOADS, help="glob of recorded /2/summary responses to replay")
+    parser.add_argument("--write-config", help="write a config file with the mock rigs to this path")
+    parser.add_argument("--offline", type=int, default=0, help="extra unreachable nodes in the written config (default: 0)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    fleet = MockFleet(args.nodes, args.base_port, args.host, args.latency / 1000, args.jitter / 1000, args.error_rate,
+                      args.timeout_rate, args.hang, args.padding, args.stable, load_payloads(args.payloads))
+    if args.write_config:
+        write_config(args.write_config, args.nodes, args.base_port, args.host, args.offline)
+    fleet.start()
+    # The benchmark suite waits for this line before polling
+    print(f"ready {args.nodes} rigs on {args.host}:{args.base_port}-{args.base_port + args.nodes - 1}", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fleet.stop()
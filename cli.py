@@ -0,0 +1,219 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import contextlib
+import json
+import signal
+import sys
+import threading
+from concurrent.futures import wait
+
+from nodes import NodeManager
+from details import describe_details
+from diagnostics import diagnostics
+from events import StatusChanged, HashrateChanged, ShareFound, PoolSwitched
+from helper import *
+
+# Headless entry point: one-shot or continuous polling without importing Tk.
+# The GUI modules are only imported when --gui is given.
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="XMRIG Node Monitor (headless)")
+    parser.add_argument("-c", "--config", action="append", help="config file or folder of per-site config files, repeat to merge several (default: config.json)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="poll every node once, print the result and exit (default)")
+    mode.add_argument("--daemon", action="store_true", help="keep polling every --interval seconds")
+    mode.add_argument("--gui", action="store_true", help="start the Tk interface")
+    parser.add_argument("-f", "--format", choices=["table", "json"], default="table", help="output format (default: table)")
+    parser.add_argument("-i", "--interval", type=float, default=5, help="base seconds between polls of a node in daemon mode (default: 5)")
+    parser.add_argument("--connect-timeout", type=float, default=3, help="per-request connect timeout in seconds (default: 3)")
+    parser.add_argument("--read-timeout", type=float, default=5, help="per-request read timeout in seconds (default: 5)")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="maximum concurrent requests (default: 32)")
+    parser.add_argument("--max-rps", type=float, default=100, help="request budget per second in daemon mode (default: 100)")
+    parser.add_argument("--events", action="store_true", help="print status flips, hashrate moves, new shares and pool switches in daemon mode")
+    parser.add_argument("--show-schedule", action="store_true", help="print the per-node poll schedule to stderr after each sweep in daemon mode")
+    parser.add_argument("--startup-budget", type=float, default=300, help="warn when startup exceeds this many milliseconds (default: 300)")
+    parser.add_argument("--details", action="store_true", help="also fetch per-backend and per-thread detail of online nodes in --once mode")
+    parser.add_argument("--timing", action="store_true", help="print startup and sweep timings to stderr")
+    parser.add_argument("--diagnostics", metavar="FILE", help="write stage timings, per-node latency percentiles and profiler results as JSON to FILE (- for stderr) on exit, and after every sweep in daemon mode")
+    parser.add_argument("--profile", action="store_true", help="run the sampling profiler, results are part of --diagnostics")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port, implies --daemon")
+    parser.add_argument("--metrics-host", default="0.0.0.0", help="address for the metrics endpoint (default: 0.0.0.0)")
+    args = parser.parse_args(argv)
+    # One path is used as is, several are merged into one fleet
+    config = args.config or ["config.json"]
+    args.config = config[0] if len(config) == 1 else config
+    return args
+
+def format_table(nodes):
+    rows = [("Status", "Name", "Host", "Hashrate 10s / 1m / 15m", "Algorithm", "Shares", "Uptime")]
+    for node in nodes:
+        rows.append((
+            "Online" if node.online else "Offline",
+            shorten_string(node.name, 20),
+            f"{node.host}:{node.port}",
+            f"{node.hashrate_10s} / {node.hashrate_1m} / {node.hashrate_15m}",
+            node.algo,
+            f"{node.shares_good}/{node.shares_total}",
+            seconds_to_string(node.uptime)
+        ))
+    widths = [max(len(str(row[col])) for row in rows) for col in range(len(rows[0]))]
+    return "\n".join("  ".join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows)
+
+def format_totals(rollup):
+    totals = rollup.summary()
+    return (f"{totals['online']}/{totals['nodes']} online, total hashrate {format_hashrate(totals['hashrate_10s'])}, "
+            f"blocks or shares {totals['shares_good']}/{totals['shares_total']}")
+
+def format_json(sweep, manager, details=None):
+    out = {"sweep": sweep, "fleet": manager.rollup.to_dict(), "nodes": [node.to_dict() for node in manager.nodes]}
+    if details is not None:
+        out["details"] = {str(node_id): value for node_id, value in details.items()}
+    return json.dumps(out)
+
+def format_details(manager, details):
+    lines = []
+    for node in manager.nodes:
+        if node.id not in details:
+            continue
+        lines.append(f"{node.name} ({node.host}:{node.port})")
+        if details[node.id] is None:
+            lines.append("    details unavailable")
+        else:
+            lines.extend(f"    {line}" for line in describe_details(details[node.id]))
+    return "\n".join(lines)
+
+def fetch_details(manager):
+    # Detail of every online node, fetched concurrently on the poll executor
+    online = [node for node in manager.nodes if node.online]
+    futures = [future for future in (manager.details.request(node) for node in online) if future is not None]
+    wait(futures)
+    return {node.id: manager.details.get(node.id) for node in online}
+
+def run_once(manager, args, output):
+    result = manager.refresh_all()
+    details = fetch_details(manager) if args.details else None
+    if args.format == "json":
+        print(format_json(result, manager, details), file=output)
+    else:
+        print(format_table(manager.nodes), file=output)
+        print(f"\n{format_totals(manager.rollup)}", file=output)
+        if details:
+            print(f"\n{format_details(manager, details)}", file=output)
+    if args.timing:
+        print(f"Sweep: {result['duration'] * 1000:.0f} ms, {result['online']}/{result['nodes']} online", file=sys.stderr)
+    return 0 if result["online"] == result["nodes"] else 1
+
+def report_sweep(manager, args, output, result, exporter):
+    if exporter is not None:
+        exporter.sync(manager.nodes, result)
+    if args.format == "json":
+        print(format_json(result, manager), file=output, flush=True)
+    else:
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} polled {result['polled']}, {format_totals(manager.rollup)}, "
+              f"sweep {result['duration'] * 1000:.0f} ms", file=output, flush=True)
+    if args.show_schedule:
+        for entry in manager.scheduler.describe():
+            print(f"  node {entry['id']}: due in {entry['due_in']}s, every {entry['interval']}s, {entry['reason']}", file=sys.stderr)
+
+def print_events(events, output):
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    for event in events:
+        node = f"{event.snapshot.name} ({event.snapshot.host}:{event.snapshot.port})"
+        if isinstance(event, StatusChanged):
+            message = "came online" if event.online else "went offline"
+        elif isinstance(event, HashrateChanged):
+            message = f"hashrate {event.old} -> {event.new} H/s ({event.change:.0%})"
+        elif isinstance(event, ShareFound):
+            message = f"found {event.new_shares} block(s) or share(s), {event.shares_good} in total"
+        else:
+            message = f"switched pool {event.old} -> {event.new}"
+        print(f"{stamp} {node} {message}", file=output, flush=True)
+
+def run_daemon(manager, args, output):
+    # Stop cleanly on SIGTERM (systemd) as well as Ctrl+C
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    exporter = None
+    if args.metrics_port:
+        from exporter import MetricsExporter
+
+        exporter = MetricsExporter(manager.rollup)
+        exporter.subscribe(manager.events)
+        exporter.sync(manager.nodes)
+        exporter.start(args.metrics_host, args.metrics_port)
+
+    if args.events:
+        manager.events.subscribe(lambda events: print_events(events, output), [StatusChanged, HashrateChanged, ShareFound, PoolSwitched])
+
+    # Nodes are polled on their own adaptive schedule, --interval is the base interval
+    manager.scheduler.base_interval = args.interval
+    manager.scheduler.max_interval = max(manager.scheduler.max_interval, args.interval)
+    manager.scheduler.max_rps = args.max_rps
+
+    try:
+        while not stop.is_set():
+            added, removed, changed = manager.apply_config_changes()
+            if added or removed or changed:
+                print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} config reloaded: {len(added)} added, {len(removed)} removed, {len(changed)} changed", file=sys.stderr)
+            result = manager.refresh_due()
+            if result["polled"]:
+                report_sweep(manager, args, output, result, exporter)
+                if args.diagnostics and args.diagnostics != "-":
+                    write_diagnostics(manager, args)
+            stop.wait(min(max(manager.scheduler.next_wakeup(), 0.2), args.interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        manager.history.flush()
+    return 0
+
+def run_gui(args):
+    from ttkthemes import ThemedTk
+    from main import MainGUI
+
+    root = ThemedTk(theme="arc")
+    MainGUI(root, filename=args.config)
+    root.mainloop()
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.gui:
+        return run_gui(args)
+
+    # Node and NodeManager report progress with print, keep stdout for the actual output
+    output = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        return run_headless(args, output)
+
+def write_diagnostics(manager, args):
+    diagnostics.dump(args.diagnostics, {node.id: f"{node.name} ({node.host}:{node.port})" for node in manager.nodes})
+
+def run_headless(args, output):
+    manager = NodeManager(args.config, max_in_flight=args.max_in_flight, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout, watch=bool(args.daemon or args.metrics_port))
+
+    startup = (time.perf_counter() - STARTED) * 1000
+    if args.timing:
+        print(f"Startup: {startup:.1f} ms (budget {args.startup_budget:.0f} ms)", file=sys.stderr)
+    if startup > args.startup_budget:
+        print(f"Warning: Startup took {startup:.1f} ms, over the {args.startup_budget:.0f} ms budget", file=sys.stderr)
+
+    if args.profile:
+        diagnostics.profiler.start()
+    try:
+        if args.daemon or args.metrics_port:
+            return run_daemon(manager, args, output)
+        return run_once(manager, args, output)
+    finally:
+        diagnostics.profiler.stop()
+        if args.diagnostics:
+            write_diagnostics(manager, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import zlib
+
+# Fleet configuration: one JSON file, several files, or directories of per-site files ("nodes" lists).
+# With a single file node ids are used as written. With several files every node id is namespaced by
+# its site (the file name without extension): site prefix * SITE_ID_SPAN + id in the file, so adding,
+# removing or reordering other site files never changes a node's id. History and the state cache are
+# keyed by these ids.
+#
+# Edits are written in the background: each changed file is rewritten at most once per debounce,
+# atomically, and untouched files are never written. A watcher thread picks up edits made by other
+# programs and queues them per node, NodeManager.apply_config_changes applies them.
+
+SITE_ID_SPAN = 1000000
+
+def site_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def site_prefix(site):
+    return zlib.crc32(site.encode()) % 999983 + 1
+
+def read_nodes(path, span=None):
+    # ({id in file: (host, port)}, whether ids were changed), raises ValueError on anything that is not a valid node list.
+    # A node whose id was already used further up in the file, or that does not fit into 0 <= id < span, gets the next
+    # free id, nothing is ever dropped.
+    try:
+        with open(path, "r") as file:
+            content = json.load(file)
+        entries = [(int(node["id"]), str(node["host"]), int(node["port"])) for node in content.get("nodes", [])]
+    except (AttributeError, KeyError, TypeError) as e:
+        raise ValueError(f"unexpected layout ({e})")
+    nodes = {}
+    renumbered = False
+    usable = lambda local_id: span is None or 0 <= local_id < span
+    next_id = max((entry[0] for entry in entries if usable(entry[0])), default=0) + 1
+    for local_id, host, port in entries:
+        if local_id in nodes or not usable(local_id):
+            print(f"Warning: Node id {local_id} is used more than once or out of range in '{path}', {host}:{port} gets id {next_id}.")
+            local_id = next_id
+            next_id += 1
+            renumbered = True
+        nodes[local_id] = (host, port)
+    return nodes, renumbered
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+class ConfigSource:
+    __slots__ = ("path", "prefix", "nodes", "signature", "dirty")
+
+    def __init__(self, path, prefix):
+        self.path = path
+        self.prefix = prefix
+        # id in file -> (host, port), as last read or written
+        self.nodes = {}
+        self.signature = None
+        self.dirty = False
+
+    def global_id(self, local_id):
+        return self.prefix * SITE_ID_SPAN + local_id
+
+    def local_id(self, node_id):
+        return node_id - self.prefix * SITE_ID_SPAN
+
+class FleetConfig:
+    def __init__(self, paths, debounce=2, watch_interval=2):
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        self.files = [path for path in paths if not os.path.isdir(path)]
+        self.directories = [path for path in paths if os.path.isdir(path)]
+        # A lone file keeps its ids as written, everything else is namespaced by site
+        self.namespaced = len(paths) > 1 or bool(self.directories)
+        self.debounce = debounce
+        self.watch_interval = watch_interval
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.sources = {}
+        # node id -> source
+        self.owners = {}
+        self.timer = None
+        self.watcher = None
+        self.stopped = threading.Event()
+        # (added [(id, host, port)], removed [id], changed [(id, host, port)]) per external edit
+        self.changes = queue.Queue()
+        atexit.register(self.flush)
+
+    def paths(self):
+        found = list(self.files)
+        for directory in self.directories:
+            try:
+                found += sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json"))
+            except OSError as e:
+                print(f"Error listing config directory '{directory}': {e}")
+        # A file given twice, or also found in a given directory, is loaded once
+        unique = {}
+        for path in found:
+            unique.setdefault(os.path.realpath(path), path)
+        return list(unique.values())
+
+    def span(self):
+        # Ids a site file may use without running into the next site's ids
+        return SITE_ID_SPAN if self.namespaced else None
+
+    def add_source(self, path):
+        prefix = 0
+        if self.namespaced:
+            prefix = site_prefix(site_name(path))
+            taken = {source.prefix for other, source in self.sources.items() if other != path}
+            while prefix in taken:
+                # Two site names hashing to the same prefix, the later one moves on
+                print(f"Warning: Site '{site_name(path)}' collides with another site, its node ids are not stable.")
+                prefix = prefix % 999983 + 1
+        source = self.sources[path] = ConfigSource(path, prefix)
+        return source
+
+    def load(self):
+        # [(id, host, port)] of every node, files in order, nodes in file order
+        out = []
+        renumbered = False
+        with self.lock:
+            for path in self.paths():
+                source = self.add_source(path)
+                source.signature = file_signature(path)
+                try:
+                    source.nodes, source.dirty = read_nodes(path, self.span())
+                except (OSError, ValueError) as e:
+                    print(f"Error loading nodes from '{path}': {e}")
+                    continue
+                renumbered = renumbered or source.dirty
+                # Unique per file, and sites never share a prefix, so ids are unique across the fleet
+                for local_id, (host, port) in source.nodes.items():
+                    node_id = source.global_id(local_id)
+                    self.owners[node_id] = source
+                    out.append((node_id, host, port))
+        if renumbered:
+            # Store the new ids right away, history and the state cache are keyed by them
+            self.flush()
+        return out
+
+    def create(self, path):
+        # Empty config for a file that does not exist yet, written right away
+        with self.lock:
+            source = self.sources.get(path) or self.add_source(path)
+            source.dirty = True
+        self.flush()
+
+    # Edits, the file is written once the debounce has passed
+
+    def primary(self):
+        # New nodes go to the first file
+        if not self.sources:
+            paths = self.paths()
+            self.add_source(paths[0] if paths else os.path.join(self.directories[0], "nodes.json"))
+        return next(iter(self.sources.values()))
+
+    def add_node(self, host, port):
+        with self.lock:
+            source = self.primary()
+            local_id = max(source.nodes, default=0) + 1
+            source.nodes[local_id] = (host, port)
+            node_id = source.global_id(local_id)
+            self.owners[node_id] = source
+            self.touch(source)
+        return node_id
+
+    def update_node(self, node_id, host, port):
+        with self.lock:
+            source = self.owners.get(node_id)
+            if source is not None:
+                source.nodes[source.local_id(node_id)] = (host, port)
+                self.touch(source)
+
+    def remove_node(self, node_id):
+        with self.lock:
+            source = self.owners.pop(node_id, None)
+            if source is not None:
+                source.nodes.pop(source.local_id(node_id), None)
+                self.touch(source)
+
+    def sync(self, nodes):
+        # Bring the files in line with a node list that was edited directly
+        current = {node.id: (node.host, node.port) for node in nodes}
+        for node_id in [node_id for node_id in self.owners if node_id not in current]:
+            self.remove_node(node_id)
+        for node_id, (host, port) in current.items():
+            source = self.owners.get(node_id)
+            if source is None:
+                with self.lock:
+                    source = self.primary()
+                    self.owners[node_id] = source
+            if source.nodes.get(source.local_id(node_id)) != (host, port):
+                self.update_node(node_id, host, port)
+
+    def touch(self, source):
+        # Caller holds the lock
+        source.dirty = True
+        if self.timer is None:
+            self.timer = threading.Timer(self.debounce, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            work = []
+            for source in self.sources.values():
+                if source.dirty:
+                    source.dirty = False
+                    work.append((source, [{"id": local_id, "host": host, "port": port} for local_id, (host, port) in source.nodes.items()]))
+        for source, nodes in work:
+            self.write(source, nodes)
+
+    def write(self, source, nodes):
+        # Temporary file next to the target and a rename, other readers never see a half-written config
+        temporary = f"{source.path}.tmp"
+        with self.write_lock:
+            try:
+                with open(temporary, "w") as file:
+                    json.dump({"nodes": nodes}, file, indent=4)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temporary, source.path)
+                # Our own write must not come back as an external edit
+                source.signature = file_signature(source.path)
+            except IOError as e:
+                print(f"Error saving nodes to file '{source.path}': {e}")
+
+    # External edits
+
+    def start_watching(self):
+        if self.watcher is None:
+            self.watcher = threading.Thread(target=self.watch, daemon=True, name="config-watcher")
+            self.watcher.start()
+
+    def stop(self):
+        # Final write, afterwards nothing keeps this config alive until exit
+        self.stopped.set()
+        atexit.unregister(self.flush)
+        self.flush()
+
+    def watch(self):
+        while not self.stopped.wait(self.watch_interval):
+            self.check()
+
+    def check(self):
+        # One pass over every config file, queues what changed since it was last read or written
+        paths = self.paths()
+        for path in paths:
+            with self.lock:
+                source = self.sources.get(path)
+            if source is None:
+                with self.lock:
+                    source = self.add_source(path)
+            signature = file_signature(path)
+            if signature is None or signature == source.signature:
+                continue
+            try:
+                nodes, renumbered = read_nodes(path, self.span())
+            except (OSError, ValueError) as e:
+                # Most likely an editor halfway through saving, the next write brings it back
+                print(f"Ignoring changed config '{path}' for now: {e}")
+                source.signature = signature
+                continue
+            self.reload(source, nodes, signature)
+            if renumbered:
+                with self.lock:
+                    self.touch(source)
+
+        # Files that disappeared from a watched directory take their nodes with them
+        for path in [path for path in self.sources if path not in paths and path not in self.files]:
+            with self.lock:
+                source = self.sources.pop(path)
+            self.reload(source, {}, None)
+
+    def reload(self, source, nodes, signature):
+        # The file wins over edits of the same file that were not written yet
+        with self.lock:
+            added, removed, changed = [], [], []
+            for local_id, address in nodes.items():
+                node_id = source.global_id(local_id)
+                previous = source.nodes.get(local_id)
+                if previous is None:
+                    self.owners[node_id] = source
+                    added.append((node_id, *address))
+                elif previous != address:
+                    changed.append((node_id, *address))
+            for local_id in source.nodes:
+                if local_id not in nodes:
+                    node_id = source.global_id(local_id)
+                    self.owners.pop(node_id, None)
+                    removed.append(node_id)
+            source.nodes = dict(nodes)
+            source.signature = signature
+        if added or removed or changed:
+            print(f"Config '{source.path}' changed: {len(added)} added, {len(removed)} removed, {len(changed)} changed")
+            self.changes.put((added, removed, changed))
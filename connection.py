@@ -0,0 +1,127 @@
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+class DNSCache:
+    def __init__(self, ttl=300, negative_ttl=30):
+        self.ttl = ttl
+        # Seconds a failed lookup is remembered, an unresolvable rig costs one lookup per negative_ttl instead of two per poll
+        self.negative_ttl = negative_ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host, port):
+        # Every address of the host in resolver order, the last one that answered first.
+        # Raises requests.ConnectionError for a host that does not resolve.
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(host)
+            if entry and entry[1] > now:
+                self.hits += 1
+                if entry[0] is None:
+                    raise requests.ConnectionError(f"Could not resolve host '{host}' (cached)")
+                return entry[0]
+            self.misses += 1
+
+        try:
+            addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)))
+            if not addresses:
+                raise socket.gaierror(f"no addresses for '{host}'")
+        except (socket.gaierror, OSError) as e:
+            # Keep serving stale addresses if the resolver is down, otherwise remember the failure for a while
+            if entry and entry[0] is not None:
+                return entry[0]
+            with self.lock:
+                self.entries[host] = (None, now + self.negative_ttl)
+            raise requests.ConnectionError(f"Could not resolve host '{host}': {e}")
+
+        with self.lock:
+            self.entries[host] = (addresses, now + self.ttl)
+        return addresses
+
+    def prefer(self, host, address):
+        # Try an address that answered first from now on, e.g. the IPv4 one of a dual-stack host whose miner only listens on IPv4
+        with self.lock:
+            entry = self.entries.get(host)
+            if entry and entry[0] and entry[0][0] != address and address in entry[0]:
+                self.entries[host] = ([address] + [other for other in entry[0] if other != address], entry[1])
+
+    def invalidate(self, host):
+        with self.lock:
+            self.entries.pop(host, None)
+
+class ConnectionPool:
+    def __init__(self, hosts=0, pool_maxsize=2, dns_ttl=300):
+        # pool_maxsize is the number of keep-alive connections kept per host
+        self.pool_maxsize = pool_maxsize
+        self.capacity = 0
+        self.adapter = None
+        # Connections opened by adapters that were replaced, stats() keeps counting them
+        self.retired_connections = 0
+        self.session = requests.Session()
+        self.dns = DNSCache(dns_ttl)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.ensure_capacity(hosts)
+
+    def ensure_capacity(self, hosts):
+        # Keep one pool per host, remount with more room when the fleet outgrows the adapter
+        if hosts <= self.capacity and self.adapter is not None:
+            return
+        self.capacity = max(64, hosts * 2)
+        previous = self.adapter
+        self.adapter = HTTPAdapter(pool_connections=self.capacity, pool_maxsize=self.pool_maxsize, max_retries=0)
+        self.session.mount("http://", self.adapter)
+        if previous is not None:
+            # The old pools are not used anymore, close their sockets instead of leaking them
+            with self.lock:
+                self.retired_connections += self.opened_connections(previous)
+            previous.close()
+
+    def get(self, host, port, path, timeout=None):
+        # Addresses are tried in order until one connects, like urllib3 does when it resolves on its own
+        addresses = self.dns.resolve(host, port)
+        with self.lock:
+            self.requests += 1
+        for position, address in enumerate(addresses):
+            url = f"http://[{address}]:{port}{path}" if ":" in address else f"http://{address}:{port}{path}"
+            try:
+                response = self.session.get(url, headers={"Host": f"{host}:{port}"}, timeout=timeout)
+            except requests.ConnectionError:
+                if position + 1 < len(addresses):
+                    continue
+                self.dns.invalidate(host)
+                raise
+            if position:
+                self.dns.prefer(host, address)
+            return response
+
+    def opened_connections(self, adapter):
+        # Each per-host urllib3 pool counts the connections it had to open
+        pools = adapter.poolmanager.pools
+        opened = 0
+        for key in pools.keys():
+            try:
+                opened += pools[key].num_connections
+            except KeyError:
+                continue
+        return opened
+
+    def stats(self):
+        opened = self.opened_connections(self.adapter)
+        with self.lock:
+            opened += self.retired_connections
+            return {
+                "requests": self.requests,
+                "connections_opened": opened,
+                "connections_reused": max(self.requests - opened, 0),
+                "dns_hits": self.dns.hits,
+                "dns_misses": self.dns.misses
+            }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import requests
+
+from events import HashrateChanged, StatusChanged
+from summary import loads
+
+# Per-backend and per-thread detail from /2/backends (falling back to /1/threads on older
+# xmrig builds). Much heavier than /2/summary, so it is only fetched on demand: when a row
+# is expanded, when a node's hashrate drops sharply, or explicitly from the CLI. Results
+# are cached per node for a TTL and a node is never fetched more than once per min_interval.
+
+def hashrate_triple(value):
+    value = list(value or ())[:3]
+    return [entry or 0 for entry in value] + [0] * (3 - len(value))
+
+def decode_backends(body):
+    backends = []
+    for backend in loads(body) or ():
+        if not isinstance(backend, dict):
+            continue
+        backends.append({
+            "type": backend.get("type", "unknown"),
+            "enabled": bool(backend.get("enabled", False)),
+            "algo": backend.get("algo"),
+            "hashrate": hashrate_triple(backend.get("hashrate")),
+            "hugepages": backend.get("hugepages"),
+            "msr": backend.get("msr"),
+            "asm": backend.get("asm"),
+            "dataset_host": backend.get("dataset_host"),
+            "threads": [{
+                "affinity": thread.get("affinity", -1),
+                "hashrate": hashrate_triple(thread.get("hashrate"))
+            } for thread in backend.get("threads") or () if isinstance(thread, dict)]
+        })
+    return {"source": "/2/backends", "backends": backends}
+
+def decode_threads(body):
+    res = loads(body) or {}
+    threads = [{
+        "affinity": thread.get("affine_to_cpu", thread.get("affinity", -1)),
+        "hashrate": hashrate_triple(thread.get("hashrate"))
+    } for thread in res.get("threads") or () if isinstance(thread, dict)]
+    total = [sum(thread["hashrate"][window] for thread in threads) for window in range(3)]
+    return {"source": "/1/threads", "backends": [{
+        "type": "cpu", "enabled": True, "algo": res.get("algo"), "hashrate": total, "hugepages": res.get("hugepages"),
+        "msr": None, "asm": None, "dataset_host": None, "threads": threads
+    }]}
+
+class DetailCollector:
+    def __init__(self, manager, ttl=60, min_interval=30, drop_threshold=0.10):
+        self.manager = manager
+        self.ttl = ttl
+        self.min_interval = min_interval
+        self.drop_threshold = drop_threshold
+        self.lock = threading.Lock()
+        # node id -> details dict, including "fetched_at"
+        self.cache = {}
+        # node id -> callbacks waiting for the fetch in flight
+        self.pending = {}
+        self.last_attempt = {}
+        self.fetches = 0
+
+    def subscribe(self, events):
+        events.subscribe(self.handle_events, [HashrateChanged, StatusChanged])
+
+    def handle_events(self, events):
+        # Prefetch detail for nodes whose hashrate dropped past the threshold or that just came back
+        nodes = {node.id: node for node in self.manager.nodes}
+        for event in events:
+            node = nodes.get(event.node_id)
+            if node is None:
+                continue
+            if isinstance(event, HashrateChanged) and event.new < event.old * (1 - self.drop_threshold):
+                self.request(node)
+            elif isinstance(event, StatusChanged) and event.online and event.node_id in self.cache:
+                self.request(node)
+
+    def get(self, node_id):
+        # Cached detail if still fresh, never triggers a request
+        with self.lock:
+            details = self.cache.get(node_id)
+        if details is not None and time.time() - details["fetched_at"] < self.ttl:
+            return details
+        return None
+
+    def request(self, node, callback=None):
+        # Fetch in the background unless fresh or already in flight. callback(node_id, details) runs
+        # exactly once, on a worker thread unless the answer is already known, with None on failure.
+        # Within min_interval of the last attempt the last known (possibly stale) detail is returned.
+        cached = self.get(node.id)
+        with self.lock:
+            if cached is None and node.id in self.pending:
+                if callback is not None:
+                    self.pending[node.id].append(callback)
+                return None
+            if cached is None and time.time() - self.last_attempt.get(node.id, 0) < self.min_interval:
+                cached = self.cache.get(node.id)
+            elif cached is None:
+                self.pending[node.id] = [callback] if callback is not None else []
+                self.last_attempt[node.id] = time.time()
+                return self.manager.executor.submit(self.fetch, node)
+        if callback is not None:
+            callback(node.id, cached)
+        return None
+
+    def fetch(self, node):
+        details = None
+        try:
+            details = self.fetch_details(node)
+        finally:
+            with self.lock:
+                callbacks = self.pending.pop(node.id, [])
+                if details is not None:
+                    self.cache[node.id] = details
+            for callback in callbacks:
+                callback(node.id, details)
+        return details
+
+    def fetch_details(self, node):
+        connection = self.manager.connection
+        timeout = self.manager.timeout
+        try:
+            self.fetches += 1
+            response = connection.get(node.host, node.port, "/2/backends", timeout=timeout)
+            if response.status_code == 200:
+                details = decode_backends(response.content)
+            elif response.status_code == 404:
+                # Older xmrig builds only have the v1 API
+                response = connection.get(node.host, node.port, "/1/threads", timeout=timeout)
+                if response.status_code != 200:
+                    return None
+                details = decode_threads(response.content)
+            else:
+                return None
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            print(f"Failed to fetch details from {node.host}:{node.port}: {e}")
+            return None
+        details["fetched_at"] = time.time()
+        return details
+
+    def forget(self, node_id):
+        with self.lock:
+            self.cache.pop(node_id, None)
+            self.last_attempt.pop(node_id, None)
+
+def detail_rows(details):
+    # (depth, label, hashrate, notes) per backend, each followed by its threads
+    rows = []
+    for backend in details["backends"]:
+        notes = ["enabled" if backend["enabled"] else "disabled"]
+        if backend["hugepages"]:
+            notes.append(f"huge pages {backend['hugepages'][0]}/{backend['hugepages'][1]}")
+        if backend["msr"] is not None:
+            notes.append(f"msr {'on' if backend['msr'] else 'off'}")
+        if backend["asm"]:
+            notes.append(f"asm {backend['asm']}")
+        if backend["dataset_host"] is not None:
+            notes.append(f"dataset on {'host' if backend['dataset_host'] else 'device'}")
+        rows.append((0, f"{backend['type']} ({backend['algo'] or 'N/A'})", " / ".join(map(str, backend["hashrate"])), ", ".join(notes)))
+        for thread in backend["threads"]:
+            rows.append((1, f"thread on cpu {thread['affinity']}", " / ".join(map(str, thread["hashrate"])), ""))
+    return rows
+
+def describe_details(details):
+    # Plain text lines, threads indented under their backend
+    return [f"{'    ' * depth}{label}: {hashrate}" + (f"  [{notes}]" if notes else "") for depth, label, hashrate, notes in detail_rows(details)]
@@ -0,0 +1,263 @@
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Hot-path instrumentation: stage timers, counters, per-node request latency and an opt-in
+# sampling profiler. Timings go into fixed log-spaced histograms, so recording is a bucket
+# lookup and an increment, nothing is kept per sample and percentiles never sort anything.
+#
+# Stages recorded by the monitor:
+#   request  HTTP round trip of one /2/summary poll (per node as well)
+#   decode   JSON decode and copy onto the node
+#   diff     snapshot and change events of one node
+#   history  history samples of one sweep
+#   publish  change event subscribers of one sweep (rollups, exporter, GUI queue)
+#   sweep    one whole NodeManager.poll
+#   render   one pass of the GUI over its update queue
+#   rows     the table rows changed in that pass
+
+# Bucket upper bounds in seconds, 10 us to ~60 s, each 25% wider than the one before
+BOUNDS = [1e-5 * 1.25 ** index for index in range(71)]
+
+def bucket_index(seconds):
+    # The last bucket takes everything slower
+    return min(bisect_left(BOUNDS, seconds), len(BOUNDS) - 1)
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max", "lock")
+
+    def __init__(self):
+        self.counts = array("L", bytes(array("L").itemsize * len(BOUNDS)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        index = bucket_index(seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, fraction):
+        # Interpolated inside the bucket holding the percentile, never off by more than the bucket width
+        with self.lock:
+            target = fraction * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                if count and seen + count >= target:
+                    low = BOUNDS[index - 1] if index else 0.0
+                    return min(low + (BOUNDS[index] - low) * (target - seen) / count, self.max)
+                seen += count
+        return 0.0
+
+    def summary(self):
+        count = self.count
+        return {
+            "count": count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / count * 1000, 3) if count else 0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+# Top frames of threads that are only waiting for work, their samples are counted as idle
+IDLE_FRAMES = frozenset([("thread.py", "_worker"), ("threading.py", "wait"), ("__init__.py", "mainloop")])
+
+class SamplingProfiler:
+    # Samples the stack of every other thread every `interval` seconds while running.
+    # Off by default, costs nothing until started.
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # "file:line function" -> samples with that frame on top / anywhere on the stack
+            self.own = Counter()
+            self.cumulative = Counter()
+            self.samples = 0
+            self.idle = 0
+            # A running profiler keeps sampling, its clock starts over
+            self.started = time.time() if self.running else None
+            self.elapsed = 0.0
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.started = time.time()
+            self.thread = threading.Thread(target=self.run, daemon=True, name="sampling-profiler")
+            self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+            self.elapsed += time.time() - self.started
+
+    def run(self):
+        me = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == me:
+                        continue
+                    if (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                        self.idle += 1
+                        continue
+                    self.samples += 1
+                    self.own[self.label(frame)] += 1
+                    seen = set()
+                    while frame is not None:
+                        label = self.label(frame)
+                        if label not in seen:
+                            seen.add(label)
+                            self.cumulative[label] += 1
+                        frame = frame.f_back
+
+    def label(self, frame):
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno} {code.co_name}"
+
+    def report(self, limit=20):
+        with self.lock:
+            samples = self.samples or 1
+            return {
+                "running": self.running,
+                "interval_ms": self.interval * 1000,
+                "samples": self.samples,
+                "idle_samples": self.idle,
+                "seconds": round(self.elapsed + (time.time() - self.started if self.running else 0), 1),
+                "own": [{"function": label, "samples": count, "share": round(count / samples, 3), "cumulative_share": round(self.cumulative[label] / samples, 3)}
+                        for label, count in self.own.most_common(limit)],
+                "cumulative": [{"function": label, "samples": count, "share": round(count / samples, 3)} for label, count in self.cumulative.most_common(limit)]
+            }
+
+class Diagnostics:
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.profiler = SamplingProfiler()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.stages = {}
+            self.counters = Counter()
+            # node id -> (request latency histogram, failure count)
+            self.nodes = {}
+        self.profiler.reset()
+
+    def stage(self, name):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.stages.setdefault(name, Histogram())
+        return histogram
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.stage(name).add(seconds)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += amount
+
+    def record_node(self, node_id, seconds, ok=True):
+        if not self.enabled:
+            return
+        entry = self.nodes.get(node_id)
+        if entry is None:
+            with self.lock:
+                entry = self.nodes.setdefault(node_id, [Histogram(), 0])
+        entry[0].add(seconds)
+        if not ok:
+            with self.lock:
+                entry[1] += 1
+
+    def forget_node(self, node_id):
+        with self.lock:
+            self.nodes.pop(node_id, None)
+
+    # Reports
+
+    def slowest_nodes(self, limit=10, labels=None):
+        # Nodes by p95 request latency, slowest first, labels maps node id -> display name
+        with self.lock:
+            entries = list(self.nodes.items())
+        out = []
+        for node_id, (histogram, failures) in entries:
+            row = dict(histogram.summary(), id=node_id, failures=failures)
+            if labels is not None:
+                row["node"] = labels.get(node_id, str(node_id))
+            out.append(row)
+        out.sort(key=lambda row: row["p95_ms"], reverse=True)
+        return out[:limit]
+
+    def to_dict(self, labels=None, limit=10):
+        with self.lock:
+            stages = list(self.stages.items())
+            counters = dict(self.counters)
+        return {
+            "since": self.started,
+            "seconds": round(time.time() - self.started, 1),
+            "stages": {name: histogram.summary() for name, histogram in stages},
+            "counters": counters,
+            "slowest_nodes": self.slowest_nodes(limit, labels),
+            "profile": self.profiler.report() if self.profiler.samples or self.profiler.running else None
+        }
+
+    def dump(self, path, labels=None):
+        # JSON snapshot, "-" writes to stderr
+        text = json.dumps(self.to_dict(labels, limit=50), indent=4)
+        if path == "-":
+            print(text, file=sys.stderr)
+            return
+        try:
+            with open(path, "w") as file:
+                file.write(text)
+        except OSError as e:
+            print(f"Error writing diagnostics to '{path}': {e}")
+
+    def describe(self, labels=None):
+        # Plain text version of to_dict for the diagnostics window
+        report = self.to_dict(labels)
+        lines = [f"Collected over {report['seconds']} s", "", f"{'stage':<10} {'count':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for name, stage in report["stages"].items():
+            lines.append(f"{name:<10} {stage['count']:>8} {stage['mean_ms']:>9.2f} {stage['p50_ms']:>9.2f} {stage['p95_ms']:>9.2f} {stage['p99_ms']:>9.2f} {stage['max_ms']:>9.2f}")
+        if report["counters"]:
+            lines += ["", "Counters: " + ", ".join(f"{name} {value}" for name, value in sorted(report["counters"].items()))]
+        lines += ["", "Slowest nodes (request latency)", f"{'node':<32} {'polls':>6} {'failed':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+        for row in report["slowest_nodes"]:
+            lines.append(f"{row.get('node', str(row['id']))[:32]:<32} {row['count']:>6} {row['failures']:>6} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+        profile = report["profile"]
+        if profile:
+            lines += ["", f"Profiler: {profile['samples']} samples over {profile['seconds']} s" + (" (running)" if profile["running"] else ""),
+                      f"{'own':>6} {'total':>6}  function"]
+            for entry in profile["own"]:
+                lines.append(f"{entry['share']:>6.1%} {entry['cumulative_share']:>6.1%}  {entry['function']}")
+        return "\n".join(lines)
+
+# Shared by every module of the process
+diagnostics = Diagnostics()
@@ -0,0 +1,68 @@
+import threading
+from collections import namedtuple
+
+# Typed change events, computed by Node.update_node from the difference between two snapshots.
+# Every event carries the new snapshot so subscribers never have to re-read the node.
+FieldsChanged = namedtuple("FieldsChanged", ["node_id", "fields", "snapshot"])
+StatusChanged = namedtuple("StatusChanged", ["node_id", "online", "snapshot"])
+HashrateChanged = namedtuple("HashrateChanged", ["node_id", "old", "new", "change", "snapshot"])
+ShareFound = namedtuple("ShareFound", ["node_id", "new_shares", "shares_good", "snapshot"])
+PoolSwitched = namedtuple("PoolSwitched", ["node_id", "old", "new", "snapshot"])
+
+# Relative 10s hashrate move that counts as a HashrateChanged event
+HASHRATE_CHANGE_THRESHOLD = 0.05
+
+# Fields that move on every successful poll, they never produce an event on their own
+VOLATILE_FIELDS = frozenset(["success_count", "uptime", "last_update"])
+
+def diff_snapshots(previous, snapshot):
+    # Returns the list of events between two snapshots of the same node, empty if nothing relevant changed
+    changed = frozenset(field for field, old, new in zip(snapshot._fields, previous, snapshot) if old != new) - VOLATILE_FIELDS
+    if not changed:
+        return []
+
+    node_id = snapshot.id
+    events = [FieldsChanged(node_id, changed, snapshot)]
+    if "online" in changed:
+        events.append(StatusChanged(node_id, snapshot.online, snapshot))
+    if not previous.last_update:
+        # First report of the node, there is nothing to compare hashrate, shares or pool against
+        return events
+    if "hashrate_10s" in changed:
+        old = previous.hashrate_10s or 0
+        new = snapshot.hashrate_10s or 0
+        change = abs(new - old) / old if old else 1.0
+        if change > HASHRATE_CHANGE_THRESHOLD:
+            events.append(HashrateChanged(node_id, old, new, change, snapshot))
+    if "shares_good" in changed and snapshot.shares_good > previous.shares_good:
+        events.append(ShareFound(node_id, snapshot.shares_good - previous.shares_good, snapshot.shares_good, snapshot))
+    if "pool" in changed:
+        events.append(PoolSwitched(node_id, previous.pool, snapshot.pool, snapshot))
+    return events
+
+class EventBus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = []
+
+    def subscribe(self, callback, types=None):
+        # callback(events) receives a list of events per sweep, optionally only of the given types
+        with self.lock:
+            self.subscribers.append((callback, tuple(types) if types else None))
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            self.subscribers = [entry for entry in self.subscribers if entry[0] != callback]
+
+    def publish(self, events):
+        if not events:
+            return
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for callback, types in subscribers:
+            selected = [event for event in events if isinstance(event, types)] if types else events
+            if selected:
+                try:
+                    callback(selected)
+                except Exception as e:
+                    print(f"Error in event subscriber {callback}: {e}")
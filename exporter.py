@@ -0,0 +1,172 @@
+import math
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from events import FieldsChanged
+from rollups import DIMENSIONS
+
+# Prometheus text exposition of the last poll results. Samples are rendered per node when a
+# change event for the node arrives and the response body is rebuilt at most once per sweep,
+# so a scrape only copies bytes.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# name, type, help, value getter (node -> number or None), extra labels
+FAMILIES = [
+    ("xmrig_up", "gauge", "Whether the last poll of the miner API succeeded.", lambda node: 1 if node.online else 0, ""),
+    ("xmrig_hashrate_hs", "gauge", "Hashrate over the 10s window in H/s.", lambda node: node.hashrate_10s, 'window="10s"'),
+    ("xmrig_hashrate_hs", "gauge", "", lambda node: node.hashrate_1m, 'window="1m"'),
+    ("xmrig_hashrate_hs", "gauge", "", lambda node: node.hashrate_15m, 'window="15m"'),
+    ("xmrig_hashrate_highest_hs", "gauge", "Highest hashrate seen by the miner in H/s.", lambda node: node.highest_hashrate, ""),
+    ("xmrig_shares_good_total", "counter", "Accepted blocks or shares.", lambda node: node.shares_good, ""),
+    ("xmrig_shares_submitted_total", "counter", "Submitted blocks or shares.", lambda node: node.shares_total, ""),
+    ("xmrig_shares_avg_time_seconds", "gauge", "Average time between results in seconds.", lambda node: node.avg_time, ""),
+    ("xmrig_pool_ping_ms", "gauge", "Pool ping in milliseconds.", lambda node: node.ping, ""),
+    ("xmrig_pool_failures_total", "counter", "Pool connection failures.", lambda node: node.failures, ""),
+    ("xmrig_pool_difficulty", "gauge", "Current pool difficulty.", lambda node: node.difficulty, ""),
+    ("xmrig_memory_free_bytes", "gauge", "Free memory on the host in bytes.", lambda node: node.memory_free, ""),
+    ("xmrig_memory_total_bytes", "gauge", "Total memory on the host in bytes.", lambda node: node.memory_total, ""),
+    # Start time instead of uptime: it stays constant between polls, so it needs no re-render
+    ("xmrig_start_time_seconds", "gauge", "Unix time the miner started.", lambda node: round(node.last_update - node.uptime) if node.last_update else None, ""),
+    ("xmrig_node_info", "gauge", "Miner metadata, always 1.", lambda node: 1, None)
+]
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    return repr(value) if isinstance(value, float) else str(int(value))
+
+class MetricsExporter:
+    def __init__(self, rollup=None):
+        self.rollup = rollup
+        self.rollup_version = None
+        self.lock = threading.Lock()
+        # node id -> one rendered line per entry in FAMILIES
+        self.samples = {}
+        self.dirty = False
+        self.nodes_body = b""
+        self.fleet_body = b""
+        self.body = b""
+        self.scrapes = 0
+        self.server = None
+
+    def render_node(self, node):
+        labels = f'node="{node.id}",host="{escape_label(node.host)}:{node.port}",name="{escape_label(node.name)}"'
+        lines = []
+        for name, kind, description, getter, extra in FAMILIES:
+            if extra is None:
+                extra = (f'algo="{escape_label(node.algo)}",pool="{escape_label(node.pool)}",'
+                         f'version="{escape_label(node.ua)}",cpu="{escape_label(node.cpu_name)}"')
+            lines.append(f"{name}{{{labels}{',' + extra if extra else ''}}} {format_value(getter(node))}")
+        return lines
+
+    def subscribe(self, events):
+        events.subscribe(self.handle_events, [FieldsChanged])
+
+    def handle_events(self, events):
+        # Runs on the polling thread after each sweep, only nodes that changed are re-rendered
+        with self.lock:
+            for event in events:
+                self.samples[event.node_id] = self.render_node(event.snapshot)
+            self.dirty = True
+
+    def sync(self, nodes, sweep=None):
+        # Call after each sweep: renders nodes not seen yet, drops removed ones and refreshes the sweep metrics
+        with self.lock:
+            ids = set()
+            for node in nodes:
+                ids.add(node.id)
+                if node.id not in self.samples:
+                    self.samples[node.id] = self.render_node(node.snapshot())
+                    self.dirty = True
+            for node_id in set(self.samples) - ids:
+                del self.samples[node_id]
+                self.dirty = True
+
+            if self.dirty:
+                self.nodes_body = self.rebuild()
+                self.dirty = False
+            if self.rollup is not None and self.rollup.version != self.rollup_version:
+                self.rollup_version = self.rollup.version
+                self.fleet_body = self.render_fleet()
+            sweep_lines = []
+            if sweep is not None:
+                sweep_lines = [
+                    "# HELP xmrig_exporter_sweep_duration_seconds Duration of the last poll sweep.",
+                    "# TYPE xmrig_exporter_sweep_duration_seconds gauge",
+                    f"xmrig_exporter_sweep_duration_seconds {sweep['duration']!r}",
+                    "# HELP xmrig_exporter_last_sweep_timestamp_seconds Unix time the last poll sweep started.",
+                    "# TYPE xmrig_exporter_last_sweep_timestamp_seconds gauge",
+                    f"xmrig_exporter_last_sweep_timestamp_seconds {sweep['started']!r}",
+                    ""
+                ]
+            self.body = self.nodes_body + self.fleet_body + "\n".join(sweep_lines).encode()
+
+    def render_fleet(self):
+        # Fleet totals and per-group rollups, straight from the incrementally maintained rollup
+        totals = self.rollup.summary()
+        out = [
+            "# HELP xmrig_fleet_nodes Configured nodes by status.",
+            "# TYPE xmrig_fleet_nodes gauge",
+            f'xmrig_fleet_nodes{{status="online"}} {totals["online"]}',
+            f'xmrig_fleet_nodes{{status="offline"}} {totals["offline"]}',
+            "# HELP xmrig_fleet_hashrate_hs Total 10s hashrate of online nodes in H/s, overall and per group.",
+            "# TYPE xmrig_fleet_hashrate_hs gauge",
+            f"xmrig_fleet_hashrate_hs {format_value(totals['hashrate_10s'])}"
+        ]
+        for dimension in DIMENSIONS:
+            for group in self.rollup.breakdown(dimension):
+                out.append(f'xmrig_fleet_hashrate_hs{{{dimension}="{escape_label(group["key"])}"}} {format_value(group["hashrate_10s"])}')
+        return ("\n".join(out) + "\n").encode()
+
+    def rebuild(self):
+        out = []
+        for position, (name, kind, description, getter, extra) in enumerate(FAMILIES):
+            if description:
+                out.append(f"# HELP {name} {description}")
+                out.append(f"# TYPE {name} {kind}")
+            out.extend(lines[position] for lines in self.samples.values())
+        return ("\n".join(out) + "\n").encode()
+
+    def render(self):
+        with self.lock:
+            self.scrapes += 1
+            return self.body
+
+    # HTTP endpoint
+
+    def start(self, host="0.0.0.0", port=9189):
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Serving metrics on http://{host}:{port}/metrics")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
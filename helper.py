@@ -24,4 +24,10 @@ def seconds_to_string(seconds):
         return f"{minutes} Minutes {seconds} Seconds"
     else:
         return f"{seconds} Seconds"
-    
+
+def format_hashrate(value):
+    if value >= 1000000:
+        return f"{value / 1000000:.2f} MH/s"
+    if value >= 1000:
+        return f"{value / 1000:.2f} kH/s"
+    return f"{value:.1f} H/s"
@@ -0,0 +1,240 @@
+import atexit
+import os
+import struct
+import threading
+import time
+from array import array
+
+# One on-disk record: timestamp (double) and hashrate (float), 12 bytes
+RECORD = struct.Struct("<df")
+
+# Tiers: name, rollup bucket in seconds (0 = raw poll samples), samples kept in memory,
+# segment file length in seconds, on-disk retention in seconds
+TIERS = [
+    ("raw", 0, 360, 86400, 3 * 86400),
+    ("1m", 60, 240, 7 * 86400, 60 * 86400),
+    ("1h", 3600, 168, 90 * 86400, 730 * 86400)
+]
+
+class RingBuffer:
+    def __init__(self, size):
+        self.size = size
+        self.timestamps = array("d", bytes(8 * size))
+        self.values = array("f", bytes(4 * size))
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, value):
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def oldest(self):
+        if not self.count:
+            return None
+        return self.timestamps[(self.head - self.count) % self.size]
+
+    def items(self, start=0, end=float("inf")):
+        # Samples in chronological order, limited to [start, end]
+        out = []
+        for offset in range(self.count):
+            position = (self.head - self.count + offset) % self.size
+            timestamp = self.timestamps[position]
+            if start <= timestamp <= end:
+                out.append((timestamp, self.values[position]))
+        return out
+
+class NodeHistory:
+    def __init__(self):
+        self.rings = [RingBuffer(tier[2]) for tier in TIERS]
+        # Open rollup bucket per tier: [bucket start, sum, count]
+        self.buckets = [[0, 0.0, 0] for _ in TIERS]
+        # Records waiting to be appended to the segment files, per tier
+        self.pending = [[] for _ in TIERS]
+
+    def add(self, timestamp, value):
+        self.rings[0].append(timestamp, value)
+        self.pending[0].append((timestamp, value))
+        for tier, (name, seconds, ring_size, segment, retention) in enumerate(TIERS):
+            if not seconds:
+                continue
+            bucket = self.buckets[tier]
+            start = timestamp - timestamp % seconds
+            if bucket[2] and start != bucket[0]:
+                average = bucket[1] / bucket[2]
+                self.rings[tier].append(bucket[0], average)
+                self.pending[tier].append((bucket[0], average))
+                bucket[1] = 0.0
+                bucket[2] = 0
+            bucket[0] = start
+            bucket[1] += value
+            bucket[2] += 1
+
+    def recent(self, tier=0):
+        return [value for timestamp, value in self.rings[tier].items()]
+
+class HistoryStore:
+    def __init__(self, directory, flush_interval=60):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.series = {}
+        self.lock = threading.Lock()
+        # Held from taking the pending records until they are written, segments stay in time order
+        self.write_lock = threading.Lock()
+        self.last_flush = time.time()
+        self.last_cleanup = 0
+        atexit.register(self.flush)
+
+    def record(self, node, timestamp=None):
+        # Store the node's current 10s hashrate, returns the node's series
+        timestamp = timestamp or node.last_update or time.time()
+        with self.lock:
+            history = self.series.get(node.id)
+            if history is None:
+                history = self.series[node.id] = NodeHistory()
+            history.add(timestamp, node.hashrate_10s or 0)
+        if time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return history
+
+    def close(self):
+        # Final write, afterwards nothing keeps this store alive until exit
+        atexit.unregister(self.flush)
+        self.flush()
+
+    def record_sweep(self, nodes):
+        for node in nodes:
+            if node.online:
+                node.hashrate = self.record(node)
+
+    # Warm start: the newest raw samples go into the state cache and come back from it on startup
+
+    def recent_samples(self, node_id, limit):
+        with self.lock:
+            history = self.series.get(node_id)
+            return history.rings[0].items()[-limit:] if history is not None and limit else []
+
+    def restore(self, node_id, samples):
+        # Refill the raw ring only, the samples are already in the segment files
+        with self.lock:
+            history = self.series.get(node_id)
+            if history is None:
+                history = self.series[node_id] = NodeHistory()
+                for timestamp, value in samples:
+                    history.rings[0].append(timestamp, value)
+            return history
+
+    # Segment files: <directory>/<node id>/<tier>/<segment start>.bin, append-only fixed-size records
+
+    def segment_path(self, node_id, tier, timestamp):
+        name, seconds, ring_size, segment, retention = TIERS[tier]
+        start = int(timestamp - timestamp % segment)
+        return os.path.join(self.directory, str(node_id), name, f"{start}.bin")
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                work = []
+                for node_id, history in self.series.items():
+                    for tier, records in enumerate(history.pending):
+                        if records:
+                            work.append((node_id, tier, records))
+                            history.pending[tier] = []
+                self.last_flush = time.time()
+
+            for node_id, tier, records in work:
+                # Group by segment so each file is opened once
+                segments = {}
+                for record in records:
+                    segments.setdefault(self.segment_path(node_id, tier, record[0]), []).append(record)
+                for path, chunk in segments.items():
+                    try:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        with open(path, "ab") as file:
+                            file.write(b"".join(RECORD.pack(*record) for record in chunk))
+                    except OSError as e:
+                        print(f"Error writing history segment '{path}': {e}")
+
+        if time.time() - self.last_cleanup >= 3600:
+            self.cleanup()
+
+    def cleanup(self):
+        # Drop segments that ended before their tier's retention window
+        self.last_cleanup = time.time()
+        if not os.path.isdir(self.directory):
+            return
+        for node_id in os.listdir(self.directory):
+            for tier, (name, seconds, ring_size, segment, retention) in enumerate(TIERS):
+                folder = os.path.join(self.directory, node_id, name)
+                if not os.path.isdir(folder):
+                    continue
+                for filename in os.listdir(folder):
+                    try:
+                        if int(filename.split(".")[0]) + segment < self.last_cleanup - retention:
+                            os.remove(os.path.join(folder, filename))
+                    except (ValueError, OSError):
+                        continue
+
+    # Range queries
+
+    def pick_tier(self, start, end):
+        span = end - start
+        if span <= 6 * 3600:
+            return 0
+        if span <= 7 * 86400:
+            return 1
+        return 2
+
+    def query(self, node_id, start, end=None, tier=None):
+        # Returns [(timestamp, hashrate), ...] between start and end, from memory when the ring still covers it
+        end = end or time.time()
+        tier = self.pick_tier(start, end) if tier is None else tier
+        with self.lock:
+            history = self.series.get(node_id)
+            if history is not None:
+                oldest = history.rings[tier].oldest()
+                if oldest is not None and oldest <= start:
+                    return history.rings[tier].items(start, end)
+        self.flush()
+        return self.read_range(node_id, tier, start, end)
+
+    def read_range(self, node_id, tier, start, end):
+        name, seconds, ring_size, segment, retention = TIERS[tier]
+        folder = os.path.join(self.directory, str(node_id), name)
+        if not os.path.isdir(folder):
+            return []
+        out = []
+        for filename in sorted(os.listdir(folder), key=lambda filename: int(filename.split(".")[0])):
+            segment_start = int(filename.split(".")[0])
+            if segment_start + segment < start or segment_start > end:
+                continue
+            out.extend(self.read_segment(os.path.join(folder, filename), start, end))
+        return out
+
+    def read_segment(self, path, start, end):
+        # Binary search for the first record >= start, then read forward until end, never the whole file
+        size = RECORD.size
+        out = []
+        with open(path, "rb") as file:
+            low, high = 0, os.fstat(file.fileno()).st_size // size
+            while low < high:
+                middle = (low + high) // 2
+                file.seek(middle * size)
+                if RECORD.unpack(file.read(size))[0] < start:
+                    low = middle + 1
+                else:
+                    high = middle
+            file.seek(low * size)
+            while True:
+                chunk = file.read(size * 512)
+                chunk = chunk[:len(chunk) - len(chunk) % size]
+                if not chunk:
+                    return out
+                for timestamp, value in RECORD.iter_unpack(chunk):
+                    if timestamp > end:
+                        return out
+                    out.append((timestamp, value))
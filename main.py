@@ -1,30 +1,56 @@
 import tkinter as tk
-from tkinter import ttk, Menu, simpledialog, messagebox
+from tkinter import ttk, Menu, simpledialog, messagebox, filedialog
+import queue
 import threading
 import time
 from ttkthemes import ThemedTk
 
-from nodes import Node, NodeManager
+from nodes import NodeManager
+from events import FieldsChanged
+from details import describe_details
+from diagnostics import diagnostics
+from treeview import NodeTreeView
 from helper import *
 
+# Fleets larger than this start in the virtualized table mode
+VIRTUAL_TABLE_THRESHOLD = 200
+
+# Node fields shown in the table, changes to anything else never reach Tk
+DISPLAYED_FIELDS = frozenset([
+    "online", "name", "host", "port", "cpu_name", "cores", "threads", "memory_free", "memory_total",
+    "hashrate_10s", "hashrate_1m", "hashrate_15m", "algo", "ua", "shares_good", "shares_total", "avg_time"
+])
+
 class MainGUI:
-    def __init__(self, root):
+    def __init__(self, root, filename="config.json", autostart=True):
         self.root = root
         self.root.title("XMRIG Node Monitor by n0ctu")
         self.root.geometry("1024x600")
         self.refresh_interval = 5
+        # Milliseconds between two passes of the main loop over the update queue
+        self.frame_interval = 100
+        self.updates = queue.Queue()
+        # (node id, details) fetched on worker threads, and the open detail windows by node id
+        self.detail_updates = queue.Queue()
+        self.detail_windows = {}
 
         # Initialize Node Manager with default config file
-        self.filename = "config.json"
-        self.node_manager = NodeManager(self.filename)
+        self.filename = filename
+        self.node_manager = NodeManager(self.filename, watch=True)
         self.nodes = self.node_manager.nodes
+        self.subscription = self.subscribe_changes(self.node_manager)
+        self.virtual_table = tk.BooleanVar(value=len(self.nodes) > VIRTUAL_TABLE_THRESHOLD)
 
         # Menu
         self.create_menu()
 
+        # Fleet summary header, fed by the node manager's rollups
+        self.summary_label = ttk.Label(root, font=('Helvetica', 10), anchor='w')
+        self.summary_label.pack(side="top", fill="x", padx=10, pady=5)
+        self.summary_version = None
+
         # Frame for to contain the scrollable content
         self.frame = ttk.Frame(root)
-        self.frame.pack(fill=tk.BOTH, expand=True)
 
         # Canvas for the scrollable content
         self.canvas = tk.Canvas(self.frame)
@@ -44,12 +70,22 @@ class MainGUI:
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
 
-        # Initialize the table
-        self.init_table()
+        # Virtualized table, rows are looked up by node id
+        self.tree_view = NodeTreeView(
+            root,
+            on_edit=lambda node_id: self.edit_node(self.row_index[node_id]),
+            on_delete=lambda node_id: self.remove_node(self.row_index[node_id]),
+            on_expand=self.request_details
+        )
+
+        # Initialize the table and start draining node updates on the Tk main loop
+        self.show_table()
+        self.root.after(self.frame_interval, self.drain_updates)
 
         # Start background thread to update nodes
         self.updater_thread = threading.Thread(target=self.table_interval, daemon=True)
-        self.updater_thread.start()
+        if autostart:
+            self.updater_thread.start()
 
     # UI helpers
 
@@ -58,6 +94,7 @@ class MainGUI:
         self.file_menu = Menu(self.menu, tearoff=0)
         self.menu.add_cascade(label="File", menu=self.file_menu)
         self.file_menu.add_command(label="Select config file", command=self.select_config_file)
+        self.file_menu.add_command(label="Select config folder", command=self.select_config_folder)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self.root.quit)
 
@@ -67,6 +104,9 @@ class MainGUI:
         self.settings_menu.add_separator()
         self.settings_menu.add_command(label="Refresh all", command=self.init_table)
         self.settings_menu.add_command(label="Set refresh interval", command=self.set_refresh_interval)
+        self.settings_menu.add_checkbutton(label="Compact table (large fleets)", variable=self.virtual_table, command=self.show_table)
+        self.settings_menu.add_command(label="Show poll schedule", command=self.show_schedule)
+        self.settings_menu.add_command(label="Diagnostics", command=self.show_diagnostics)
 
         self.menu.add_command(label="?", command=self.show_help)
         self.root.config(menu=self.menu)
@@ -79,17 +119,87 @@ class MainGUI:
                                     "The nodes are saved to a config file in the same directory as the program was launched in.\n\n"
                                     "Author: n0ctu\nGitHub: https://github.com/n0ctu")
 
+    def show_schedule(self):
+        # Read-only view of the per-node poll schedule and the reason behind each interval
+        window = tk.Toplevel(self.root)
+        window.title("Poll schedule")
+        text = tk.Text(window, width=110, height=30, font=('Courier', 10))
+        text.pack(fill=tk.BOTH, expand=True)
+        hosts = {node.id: f"{node.host}:{node.port}" for node in self.nodes}
+        lines = [f"{'Host':<40} {'Due in':>7} {'Every':>7} {'Polls':>6} {'Deferred':>9}  Reason"]
+        for entry in self.node_manager.scheduler.describe():
+            lines.append(f"{shorten_string(hosts.get(entry['id'], '?'), 40):<40} {entry['due_in']:>6}s {entry['interval']:>6}s {entry['polls']:>6} {entry['deferred']:>9}  {entry['reason']}")
+        text.insert(tk.END, "\n".join(lines))
+        text.config(state="disabled")
+
+    def node_labels(self):
+        return {node.id: f"{node.name} ({node.host}:{node.port})" for node in self.nodes}
+
+    def show_diagnostics(self):
+        # Stage timings, slowest rigs and the optional sampling profiler, refreshed every second while open
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        buttons = ttk.Frame(window)
+        buttons.pack(side="top", fill="x", padx=5, pady=5)
+        profiling = tk.BooleanVar(value=diagnostics.profiler.running)
+        ttk.Checkbutton(buttons, text="Sampling profiler", variable=profiling,
+                        command=lambda: diagnostics.profiler.start() if profiling.get() else diagnostics.profiler.stop()).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Reset", command=diagnostics.reset).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Save JSON", command=self.save_diagnostics).pack(side="left", padx=5)
+        text = tk.Text(window, width=110, height=40, font=('Courier', 10))
+        text.pack(fill=tk.BOTH, expand=True)
+
+        def refresh():
+            if not text.winfo_exists():
+                return
+            text.config(state="normal")
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, diagnostics.describe(self.node_labels()))
+            text.config(state="disabled")
+            window.after(1000, refresh)
+        refresh()
+
+    def save_diagnostics(self):
+        filename = filedialog.asksaveasfilename(title="Save diagnostics", defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        if filename:
+            diagnostics.dump(filename, self.node_labels())
+
+    def update_summary(self):
+        # Only re-render the header when the rollups changed since the last frame
+        rollup = self.node_manager.rollup
+        stale = len(self.node_manager.stale)
+        if (rollup.version, stale) == self.summary_version:
+            return
+        self.summary_version = (rollup.version, stale)
+        totals = rollup.summary()
+        algos = ", ".join(f"{group['key']}: {format_hashrate(group['hashrate_10s'])} ({group['online']})" for group in rollup.breakdown("algo")[:3])
+        self.summary_label.config(text=f"Nodes: {totals['online']} online / {totals['offline']} offline    "
+                                       f"Hashrate: {format_hashrate(totals['hashrate_10s'])} (10s) / {format_hashrate(totals['hashrate_15m'])} (15m)    "
+                                       f"Blocks or Shares: {totals['shares_good']}/{totals['shares_total']}    "
+                                       f"{algos}"
+                                       + (f"    ({stale} rows from {time.strftime('%H:%M:%S', time.localtime(self.node_manager.state.saved_at))}, refreshing)" if stale else ""))
+
     def resize_root(self):
         # Resize the root window to fit the table
         width = max(self.table_grid.winfo_reqwidth() + self.scrollbar.winfo_width(), self.root.winfo_width())
-        height = root.winfo_height()
+        height = self.root.winfo_height()
         self.root.geometry(f"{width}x{height}")
 
     # Table functions
 
+    def show_table(self):
+        # Show either the widget grid or the virtualized tree view
+        if self.virtual_table.get():
+            self.frame.pack_forget()
+            self.tree_view.frame.pack(fill=tk.BOTH, expand=True)
+        else:
+            self.tree_view.frame.pack_forget()
+            self.frame.pack(fill=tk.BOTH, expand=True)
+        self.init_table()
+
     def add_table_titles(self):
         # Add title row to the table
-        titles = ["Status", "Host", "Hardware", "Hashrate", "Algorithm", "Results", "Options", ""]
+        titles = ["Status", "Host", "Hardware", "Hashrate", "Algorithm", "Results", "Options", "", ""]
         for col_index, title in enumerate(titles):
             title_label = ttk.Label(self.table_grid, text=title, font=('Helvetica', 10, 'bold'), anchor='w')
             title_label.grid(row=0, column=col_index, padx=10, pady=5, sticky='w')
@@ -97,166 +207,306 @@ class MainGUI:
     # Table rows: Each node, updated every refresh_interval seconds
 
     def table_interval(self):
+        # Runs on the updater thread: poll, changed nodes reach the main loop through queue_changes
         while True:
-            self.table_update()
+            manager = self.node_manager
+            delay = self.refresh_interval
+            try:
+                manager.refresh_due()
+                # Wake up when the next node is due, but keep an eye on newly added nodes
+                delay = min(max(manager.scheduler.next_wakeup(), 0.2), self.refresh_interval)
+            except Exception as e:
+                # open_config closes the previous manager even mid-sweep, carry on with the new one right away
+                if manager is self.node_manager:
+                    print(f"Error: Polling failed: {e}")
+                else:
+                    delay = 0
+            time.sleep(delay)
+
+    def subscribe_changes(self, manager):
+        # Bound to one manager, so the main loop can tell its snapshots apart after a config switch
+        callback = lambda events: self.queue_changes(manager, events)
+        manager.events.subscribe(callback, [FieldsChanged])
+        return callback
+
+    def queue_changes(self, manager, events):
+        # Runs on the updater thread: only snapshots of nodes whose visible fields changed are queued, never touch Tk here
+        for event in events:
+            if event.fields & DISPLAYED_FIELDS:
+                self.updates.put((manager, event.snapshot))
+
+    def drain_updates(self):
+        # Runs on the Tk main loop: apply everything queued since the last frame in one pass
+        pending = {}
+        while True:
+            try:
+                manager, snapshot = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            # Ids of a previous config may collide with the current fleet's
+            if manager is not self.node_manager:
+                continue
+            # Only the latest snapshot of each node matters
+            pending[snapshot.id] = snapshot
+
+        started = time.perf_counter()
+        self.apply_config_changes()
+        for node_id, snapshot in pending.items():
+            index = self.row_index.get(node_id)
+            if index is not None:
+                self.refresh_row(index, snapshot)
+        if len(self.stale_rows) != len(self.node_manager.stale):
+            # Polled for the first time, a node that is still down has no change event to turn "Cached" into "Offline"
+            stale = set(self.node_manager.stale)
+            for node_id in self.stale_rows - stale:
+                index = self.row_index.get(node_id)
+                node = self.node_manager.by_id.get(node_id)
+                if index is not None and node is not None:
+                    self.refresh_row(index, node.last_snapshot)
+            self.stale_rows = stale
+        if pending:
+            diagnostics.record("rows", time.perf_counter() - started)
+            diagnostics.count("rows_rendered", len(pending))
+        if pending and not self.virtual_table.get():
             self.resize_root()
-            time.sleep(self.refresh_interval)
+        self.drain_details()
+        self.update_summary()
+        if pending:
+            diagnostics.record("render", time.perf_counter() - started)
+        self.root.after(self.frame_interval, self.drain_updates)
+
+    # Backend and thread detail, fetched on demand
+
+    def request_details(self, node_id):
+        node = next((node for node in self.nodes if node.id == node_id), None)
+        if node is None:
+            return
+        # The callback may run on a worker thread, the result is applied by drain_details
+        manager = self.node_manager
+        manager.details.request(node, callback=lambda node_id, details: self.detail_updates.put((manager, node_id, details)))
+
+    def drain_details(self):
+        while True:
+            try:
+                manager, node_id, details = self.detail_updates.get_nowait()
+            except queue.Empty:
+                break
+            if manager is not self.node_manager:
+                continue
+            if self.virtual_table.get():
+                self.tree_view.show_details(node_id, details)
+            text = self.detail_windows.get(node_id)
+            if text is not None and text.winfo_exists():
+                text.config(state=tk.NORMAL)
+                text.delete("1.0", tk.END)
+                text.insert(tk.END, "\n".join(describe_details(details)) if details is not None else "Details unavailable")
+                text.config(state=tk.DISABLED)
+
+    def show_details(self, node_id):
+        node = next((node for node in self.nodes if node.id == node_id), None)
+        if node is None:
+            return
+        window = tk.Toplevel(self.root)
+        window.title(f"Details: {node.name} ({node.host}:{node.port})")
+        text = tk.Text(window, width=100, height=20, font=('Courier', 10))
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert(tk.END, "Loading details...")
+        text.config(state=tk.DISABLED)
+        self.detail_windows[node_id] = text
+        window.protocol("WM_DELETE_WINDOW", lambda: (self.detail_windows.pop(node_id, None), window.destroy()))
+        self.request_details(node_id)
+
+    def apply_config_changes(self):
+        # External edits to the config files: only the affected rows are touched
+        added, removed, changed = self.node_manager.apply_config_changes()
+        if not (added or removed or changed):
+            return
+        virtual = self.virtual_table.get()
+        if removed and not virtual:
+            # Grid rows are positional, same as deleting a node by hand
+            self.init_table()
+            return
+        self.row_index = {node.id: index for index, node in enumerate(self.nodes)}
+        for node_id in removed:
+            self.tree_view.remove_node(node_id)
+        for node in added:
+            if virtual:
+                self.tree_view.insert_node(node)
+            else:
+                self.add_table_row(self.row_index[node.id], node)
+        for node in changed:
+            self.refresh_row(self.row_index[node.id], node)
 
     def init_table(self):
-        # Clear the table grid
+        # Clear the table grid and the cell registry
         for widget in self.table_grid.winfo_children():
             widget.destroy()
-        
+        self.cells = {}
+        self.cell_state = {}
+        self.row_index = {node.id: index for index, node in enumerate(self.nodes)}
+        self.stale_rows = set(self.node_manager.stale)
+        self.tree_view.stale = self.node_manager.stale
+
+        if self.virtual_table.get():
+            self.tree_view.load(self.nodes)
+            return
+        self.tree_view.load([])
+
         # Add the title row
         self.add_table_titles()
 
         # Add a row for each node in the list
         for index, node in enumerate(self.nodes):
-            
-            # Create a new status label, col 0
-            status_label = ttk.Label(self.table_grid, text="Online" if node.online else "Offline", font=('Helvetica', 10), anchor='center', width="7", background="green" if node.online else "red", foreground="white") 
-            status_label.grid(row=index + 1, column=0, padx=10, pady=5, sticky='nw')
-
-            # Create a new name label, col 1
-            name_frame = ttk.Frame(self.table_grid)
-            name_label = ttk.Label(name_frame, text=node.name, font=('Helvetica', 10, 'bold'), anchor='w')
-            name_label.pack(side="top", fill="x")
-            name_label._identifier = "name_label"
-            host_label = ttk.Label(name_frame, text=f"{node.host} : {node.port}", font=('Helvetica', 10), anchor='w')
-            host_label.pack(side="top", fill="x")
-            name_frame.grid(row=index + 1, column=1, padx=10, pady=5, sticky='nw')
-            host_label._identifier = "host_label"
-
-            # Create a new hardware label, col 2
-            hardware_frame = ttk.Frame(self.table_grid)
-            cpu_label = ttk.Label(hardware_frame, text=f"{shorten_string(node.cpu_name, 25)}\nCores: {node.cores} / Threads: {node.threads}", font=('Helvetica', 10), anchor='w')
-            cpu_label.pack(side="top", fill="x")
-            cpu_label._identifier = "cpu_label"
-            memory_label = ttk.Label(hardware_frame, text=f"Memory Free: {(node.memory_free/1024/1024/1024):.2f} / {(node.memory_total/1024/1024/1024):.2f} GB", font=('Helvetica', 10), anchor='w')
-            memory_label.pack(side="top", fill="x")
-            memory_label._identifier = "memory_label"
-            hardware_frame.grid(row=index + 1, column=2, padx=10, pady=5, sticky='nw')
-
-            # Create a new hashrate label, col 3
-            hashrate_frame = ttk.Frame(self.table_grid)
-            hashrate_10s_label = ttk.Label(hashrate_frame, text=f"{node.hashrate_10s} (10s)", font=('Helvetica', 10, 'bold'), anchor='w')
-            hashrate_10s_label.pack(side="top", fill="x")
-            hashrate_10s_label._identifier = "hashrate_10s_label"
-            hashrate_1m_label = ttk.Label(hashrate_frame, text=f"{node.hashrate_1m} (1m)", font=('Helvetica', 10), anchor='w')
-            hashrate_1m_label.pack(side="top", fill="x")
-            hashrate_1m_label._identifier = "hashrate_1m_label"
-            hashrate_15m_label = ttk.Label(hashrate_frame, text=f"{node.hashrate_15m} (15m)", font=('Helvetica', 10), anchor='w')
-            hashrate_15m_label.pack(side="top", fill="x")
-            hashrate_15m_label._identifier = "hashrate_15m_label"
-            hashrate_frame.grid(row=index + 1, column=3, padx=10, pady=5, sticky='nw')
-
-            # Create a new algo label, col 4
-            algo_frame = ttk.Frame(self.table_grid)
-            algo_label = ttk.Label(algo_frame, text=node.algo, font=('Helvetica', 10), anchor='w')
-            algo_label.pack(side="top", fill="x")
-            algo_label._identifier = "algo_label"
-            xmrig_version_label = ttk.Label(algo_frame, text=shorten_string(node.ua, 15), font=('Helvetica', 10), anchor='w')
-            xmrig_version_label.pack(side="top", fill="x")
-            xmrig_version_label._identifier = "xmrig_version_label"
-            algo_frame.grid(row=index + 1, column=4, padx=10, pady=5, sticky='nw')
-
-            # Create a new results label, col 5
-            results_frame = ttk.Frame(self.table_grid)
-            shares_label = ttk.Label(results_frame, text=f"Blocks or Shares: {node.shares_good}/{node.shares_total}", font=('Helvetica', 10), anchor='w')
-            shares_label.pack(side="top", fill="x")
-            shares_label._identifier = "shares_label"
-            avg_time_label = ttk.Label(results_frame, text=f"Avg Time: {seconds_to_string(node.avg_time)}", font=('Helvetica', 10), anchor='w')
-            avg_time_label.pack(side="top", fill="x")
-            avg_time_label._identifier = "avg_time_label"
-            results_frame.grid(row=index + 1, column=5, padx=10, pady=5, sticky='nw')
-
-            # Create Option Buttons, col 6 - 7
-            edit_button = ttk.Button(self.table_grid, text="Edit", width="4", command=lambda idx=index: self.edit_node(idx))
-            edit_button.grid(row=index + 1, column=6, padx=10, pady=5, sticky='nw')
-            delete_button = ttk.Button(self.table_grid, text="Delete", width="6", command=lambda idx=index: self.remove_node(idx))
-            delete_button.grid(row=index + 1, column=7, padx=10, pady=5, sticky='nw')
-
-    def table_update(self):
-        for index, node in enumerate(self.nodes):
-            self.node_manager.refresh_node(index)
-            self.table_update_status(index, node, 0)
-            self.table_update_name(index, node, 1)
-            self.table_update_hardware(index, node, 2)
-            self.table_update_hashrate(index, node, 3)
-            self.table_update_algo(index, node, 4)
-            self.table_update_results(index, node, 5)
+            self.add_table_row(index, node)
+
+    def add_table_row(self, index, node):
+        # Create a new status label, col 0
+        text, background = self.node_status(node)
+        status_label = ttk.Label(self.table_grid, text=text, font=('Helvetica', 10), anchor='center', width="7", background=background, foreground="white")
+        status_label.grid(row=index + 1, column=0, padx=10, pady=5, sticky='nw')
+        self.register_cell(index, "status_label", status_label)
+
+        # Create a new name label, col 1
+        name_frame = ttk.Frame(self.table_grid)
+        name_label = ttk.Label(name_frame, text=node.name, font=('Helvetica', 10, 'bold'), anchor='w')
+        name_label.pack(side="top", fill="x")
+        self.register_cell(index, "name_label", name_label)
+        host_label = ttk.Label(name_frame, text=f"{node.host} : {node.port}", font=('Helvetica', 10), anchor='w')
+        host_label.pack(side="top", fill="x")
+        name_frame.grid(row=index + 1, column=1, padx=10, pady=5, sticky='nw')
+        self.register_cell(index, "host_label", host_label)
+
+        # Create a new hardware label, col 2
+        hardware_frame = ttk.Frame(self.table_grid)
+        cpu_label = ttk.Label(hardware_frame, text=f"{shorten_string(node.cpu_name, 25)}\nCores: {node.cores} / Threads: {node.threads}", font=('Helvetica', 10), anchor='w')
+        cpu_label.pack(side="top", fill="x")
+        self.register_cell(index, "cpu_label", cpu_label)
+        memory_label = ttk.Label(hardware_frame, text=f"Memory Free: {(node.memory_free/1024/1024/1024):.2f} / {(node.memory_total/1024/1024/1024):.2f} GB", font=('Helvetica', 10), anchor='w')
+        memory_label.pack(side="top", fill="x")
+        self.register_cell(index, "memory_label", memory_label)
+        hardware_frame.grid(row=index + 1, column=2, padx=10, pady=5, sticky='nw')
+
+        # Create a new hashrate label, col 3
+        hashrate_frame = ttk.Frame(self.table_grid)
+        hashrate_10s_label = ttk.Label(hashrate_frame, text=f"{node.hashrate_10s} (10s)", font=('Helvetica', 10, 'bold'), anchor='w')
+        hashrate_10s_label.pack(side="top", fill="x")
+        self.register_cell(index, "hashrate_10s_label", hashrate_10s_label)
+        hashrate_1m_label = ttk.Label(hashrate_frame, text=f"{node.hashrate_1m} (1m)", font=('Helvetica', 10), anchor='w')
+        hashrate_1m_label.pack(side="top", fill="x")
+        self.register_cell(index, "hashrate_1m_label", hashrate_1m_label)
+        hashrate_15m_label = ttk.Label(hashrate_frame, text=f"{node.hashrate_15m} (15m)", font=('Helvetica', 10), anchor='w')
+        hashrate_15m_label.pack(side="top", fill="x")
+        self.register_cell(index, "hashrate_15m_label", hashrate_15m_label)
+        hashrate_frame.grid(row=index + 1, column=3, padx=10, pady=5, sticky='nw')
+
+        # Create a new algo label, col 4
+        algo_frame = ttk.Frame(self.table_grid)
+        algo_label = ttk.Label(algo_frame, text=node.algo, font=('Helvetica', 10), anchor='w')
+        algo_label.pack(side="top", fill="x")
+        self.register_cell(index, "algo_label", algo_label)
+        xmrig_version_label = ttk.Label(algo_frame, text=shorten_string(node.ua, 15), font=('Helvetica', 10), anchor='w')
+        xmrig_version_label.pack(side="top", fill="x")
+        self.register_cell(index, "xmrig_version_label", xmrig_version_label)
+        algo_frame.grid(row=index + 1, column=4, padx=10, pady=5, sticky='nw')
+
+        # Create a new results label, col 5
+        results_frame = ttk.Frame(self.table_grid)
+        shares_label = ttk.Label(results_frame, text=f"Blocks or Shares: {node.shares_good}/{node.shares_total}", font=('Helvetica', 10), anchor='w')
+        shares_label.pack(side="top", fill="x")
+        self.register_cell(index, "shares_label", shares_label)
+        avg_time_label = ttk.Label(results_frame, text=f"Avg Time: {seconds_to_string(node.avg_time)}", font=('Helvetica', 10), anchor='w')
+        avg_time_label.pack(side="top", fill="x")
+        self.register_cell(index, "avg_time_label", avg_time_label)
+        results_frame.grid(row=index + 1, column=5, padx=10, pady=5, sticky='nw')
+
+        # Create Option Buttons, col 6 - 7
+        edit_button = ttk.Button(self.table_grid, text="Edit", width="4", command=lambda idx=index: self.edit_node(idx))
+        edit_button.grid(row=index + 1, column=6, padx=10, pady=5, sticky='nw')
+        delete_button = ttk.Button(self.table_grid, text="Delete", width="6", command=lambda idx=index: self.remove_node(idx))
+        delete_button.grid(row=index + 1, column=7, padx=10, pady=5, sticky='nw')
+        details_button = ttk.Button(self.table_grid, text="Details", width="7", command=lambda node_id=node.id: self.show_details(node_id))
+        details_button.grid(row=index + 1, column=8, padx=10, pady=5, sticky='nw')
+
+    def refresh_row(self, index, node):
+        if self.virtual_table.get():
+            self.tree_view.update_node(node)
+        else:
+            self.table_update_row(index, node)
+
+    def table_update_row(self, index, node):
+        # node is either a Node or a NodeSnapshot
+        self.table_update_status(index, node)
+        self.table_update_name(index, node)
+        self.table_update_hardware(index, node)
+        self.table_update_hashrate(index, node)
+        self.table_update_algo(index, node)
+        self.table_update_results(index, node)
+
+    # Cell registry: (row index, identifier) -> label, filled by init_table
+
+    def register_cell(self, index, identifier, widget):
+        self.cells[(index, identifier)] = widget
+        self.cell_state[(index, identifier)] = {}
+
+    def set_cell(self, index, identifier, **options):
+        # Only touch Tk when the rendered text or style actually changed
+        key = (index, identifier)
+        widget = self.cells.get(key)
+        if widget is None:
+            return
+        state = self.cell_state[key]
+        changed = {option: value for option, value in options.items() if state.get(option) != value}
+        if changed:
+            widget.config(**changed)
+            state.update(changed)
 
     # Update Table cols individually: Status, Hashrate, Algorithm
 
-    def table_update_status(self, index, node, col=0):
-        for field in self.table_grid.winfo_children():
-            if field.grid_info()["row"] == index + 1 and field.grid_info()["column"] == col:
-                # Update the status label
-                field.config(text="Online" if node.online else "Offline", background="green" if node.online else "red")
-                return
-
-    def table_update_name(self, index, node, col=1):
-        for field in self.table_grid.winfo_children():
-            if field.grid_info()["row"] == index + 1 and field.grid_info()["column"] == col:
-                for child in field.winfo_children():
-                    if child._identifier == "name_label":
-                        child.config(text=node.name)
-                    elif child._identifier == "host_label":
-                        child.config(text=f"{node.host} : {node.port}")
-                break
-        
-    def table_update_hardware(self, index, node, col=2):
-        for field in self.table_grid.winfo_children():
-            if field.grid_info()["row"] == index + 1 and field.grid_info()["column"] == col:
-                for child in field.winfo_children():
-                    if child._identifier == "cpu_label":
-                        child.config(text=f"{shorten_string(node.cpu_name, 25)}\nCores: {node.cores} / Threads: {node.threads}")
-                    elif child._identifier == "memory_label":
-                        child.config(text=f"Memory Free: {(node.memory_free/1024/1024/1024):.2f} / {(node.memory_total/1024/1024/1024):.2f} GB")
-                break
-
-    def table_update_hashrate(self, index, node, col=3):
-        for field in self.table_grid.winfo_children():
-            if field.grid_info()["row"] == index + 1 and field.grid_info()["column"] == col:
-                for child in field.winfo_children():
-                    if child._identifier == "hashrate_10s_label":
-                        child.config(text=f"{node.hashrate_10s} (10s)")
-                    elif child._identifier == "hashrate_1m_label":
-                        child.config(text=f"{node.hashrate_1m} (1m)")
-                    elif child._identifier == "hashrate_15m_label":
-                        child.config(text=f"{node.hashrate_15m} (15m)")
-                break
-
-    def table_update_algo(self, index, node, col=4):
-        for field in self.table_grid.winfo_children():
-            if field.grid_info()["row"] == index + 1 and field.grid_info()["column"] == col:
-                for child in field.winfo_children():
-                    if child._identifier == "algo_label":
-                        child.config(text=node.algo)
-                    elif child._identifier == "xmrig_version_label":
-                        child.config(text=shorten_string(node.ua, 15))
-                break
-    
-    def table_update_results(self, index, node, col=5):
-        for field in self.table_grid.winfo_children():
-            if field.grid_info()["row"] == index + 1 and field.grid_info()["column"] == col:
-                for child in field.winfo_children():
-                    if child._identifier == "shares_label":
-                        child.config(text=f"Blocks or Shares: {node.shares_good}/{node.shares_total}")
-                        if node.shares_good > 0:
-                            child.config(foreground="green", font=('Helvetica', 10, 'bold'))
-                    elif child._identifier == "avg_time_label":
-                        child.config(text=f"Avg Time: {seconds_to_string(node.avg_time)}")
-                break
+    def table_update_status(self, index, node):
+        text, background = self.node_status(node)
+        self.set_cell(index, "status_label", text=text, background=background)
+
+    def node_status(self, node):
+        # Rows restored from the state cache read "Cached" until their first poll
+        if node.online:
+            return "Online", "green"
+        if node.id in self.node_manager.stale:
+            return "Cached", "gray"
+        return "Offline", "red"
+
+    def table_update_name(self, index, node):
+        self.set_cell(index, "name_label", text=node.name)
+        self.set_cell(index, "host_label", text=f"{node.host} : {node.port}")
+
+    def table_update_hardware(self, index, node):
+        self.set_cell(index, "cpu_label", text=f"{shorten_string(node.cpu_name, 25)}\nCores: {node.cores} / Threads: {node.threads}")
+        self.set_cell(index, "memory_label", text=f"Memory Free: {(node.memory_free/1024/1024/1024):.2f} / {(node.memory_total/1024/1024/1024):.2f} GB")
+
+    def table_update_hashrate(self, index, node):
+        self.set_cell(index, "hashrate_10s_label", text=f"{node.hashrate_10s} (10s)")
+        self.set_cell(index, "hashrate_1m_label", text=f"{node.hashrate_1m} (1m)")
+        self.set_cell(index, "hashrate_15m_label", text=f"{node.hashrate_15m} (15m)")
+
+    def table_update_algo(self, index, node):
+        self.set_cell(index, "algo_label", text=node.algo)
+        self.set_cell(index, "xmrig_version_label", text=shorten_string(node.ua, 15))
+
+    def table_update_results(self, index, node):
+        self.set_cell(index, "shares_label", text=f"Blocks or Shares: {node.shares_good}/{node.shares_total}")
+        if node.shares_good > 0:
+            self.set_cell(index, "shares_label", foreground="green", font=('Helvetica', 10, 'bold'))
+        self.set_cell(index, "avg_time_label", text=f"Avg Time: {seconds_to_string(node.avg_time)}")
 
     # Node Management
 
     def add_node(self):
-        # Add a new node to the list
-        new_node = Node(id=len(self.nodes) + 1, host="127.0.0.1", port=8080)
-        self.nodes.append(new_node)
-        self.init_table()
-        self.node_manager.save_nodes()
+        # Add a new node to the list, the config file is written in the background
+        new_node = self.node_manager.add_node("127.0.0.1", 8080)
+        self.row_index[new_node.id] = len(self.nodes) - 1
+        if self.virtual_table.get():
+            self.tree_view.insert_node(new_node)
+        else:
+            self.add_table_row(len(self.nodes) - 1, new_node)
     
     def edit_node(self, index):
         # Edit the node at the given index
@@ -265,30 +515,66 @@ class MainGUI:
             new_host = simpledialog.askstring("Edit Node", "Enter the new host address:", initialvalue=node.host)
             new_port = simpledialog.askinteger("Edit Node", "Enter the new port number:", initialvalue=node.port)
             if new_host and new_port:
-                node.host = new_host
-                node.port = new_port
-                self.init_table()
-                self.node_manager.save_nodes()
+                self.node_manager.edit_node(node, new_host, new_port)
+                self.refresh_row(index, node)
     
     def remove_node(self, index):
         # Remove the node at the given index
         if 0 <= index < len(self.nodes):
             confirm = messagebox.askyesno("Delete Node", f"Are you sure you want to delete node {index + 1}?")
             if confirm:
-                del self.nodes[index]
-                self.init_table()
-                self.node_manager.save_nodes()
+                node = self.nodes[index]
+                self.node_manager.remove_node(node)
+                if self.virtual_table.get():
+                    # Only the removed row goes away, the rest shift up by one
+                    self.tree_view.remove_node(node.id)
+                    self.row_index = {other.id: position for position, other in enumerate(self.nodes)}
+                else:
+                    self.init_table()
     
     def set_refresh_interval(self):
         # Set the refresh interval
         new_interval = simpledialog.askinteger("Set Refresh Interval", "Enter the new refresh interval in seconds:", initialvalue=self.refresh_interval)
         if new_interval and new_interval > 0:
             self.refresh_interval = new_interval
+            scheduler = self.node_manager.scheduler
+            scheduler.base_interval = new_interval
+            scheduler.max_interval = max(scheduler.max_interval, new_interval)
         return
     
     def select_config_file(self):
-        # Select a new config file, todo
-        return
+        filename = filedialog.askopenfilename(title="Select config file", filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if filename:
+            self.open_config(filename)
+
+    def select_config_folder(self):
+        # A folder of per-site config files, merged into one fleet
+        directory = filedialog.askdirectory(title="Select config folder")
+        if directory:
+            self.open_config(directory)
+
+    def open_config(self, filename):
+        # Swap in a node manager for the new config, the updater thread picks it up on its next pass
+        previous = self.node_manager
+        self.filename = filename
+        self.node_manager = NodeManager(filename, watch=True)
+        self.nodes = self.node_manager.nodes
+        previous.events.unsubscribe(self.subscription)
+        self.subscription = self.subscribe_changes(self.node_manager)
+        self.node_manager.scheduler.base_interval = self.refresh_interval
+        previous.close()
+        # Whatever the previous manager queued belongs to the old fleet
+        for pending in (self.updates, self.detail_updates):
+            while True:
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+        for text in self.detail_windows.values():
+            text.winfo_toplevel().destroy()
+        self.detail_windows = {}
+        self.summary_version = None
+        self.init_table()
 
 if __name__ == "__main__":
     root = ThemedTk(theme="arc")
@@ -1,9 +1,33 @@
-import json
 import requests
 import os
+import queue
 import time
+from collections import namedtuple
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from connection import ConnectionPool
+from history import HistoryStore
+from scheduler import PollScheduler
+from summary import SUMMARY_FIELDS, decode_summary
+from events import EventBus, diff_snapshots
+from rollups import FleetRollup
+from details import DetailCollector
+from state import StateCache
+from config import FleetConfig
+from diagnostics import diagnostics
+
+# Immutable copy of a node's state, safe to hand from the polling thread to the GUI thread
+NodeSnapshot = namedtuple("NodeSnapshot", [
+    "id", "host", "port", "name", "online", "success_count", "ua", "uptime", "algo", "pool", "ping",
+    "failures", "difficulty", "hashrate_10s", "hashrate_1m", "hashrate_15m", "highest_hashrate",
+    "cpu_name", "cores", "threads", "memory_free", "memory_total", "shares_good", "shares_total", "avg_time", "last_update"
+])
+node_fields = attrgetter(*NodeSnapshot._fields)
 
 class Node:
+    __slots__ = NodeSnapshot._fields + ("hashrate", "last_snapshot")
+
     def __init__(self, id, host, port):
         self.id = id
         self.host = host
@@ -18,7 +42,7 @@ class Node:
         self.ping = 0
         self.failures = 0
         self.difficulty = 0
-        self.hashrate = []
+        self.hashrate = None  # NodeHistory, attached by NodeManager once the node reports
         self.hashrate_10s = 0
         self.hashrate_1m = 0
         self.hashrate_15m = 0
@@ -32,119 +56,250 @@ class Node:
         self.shares_total = 0
         self.avg_time = 0
         self.last_update = 0
+        # State the next poll is compared against
+        self.last_snapshot = self.snapshot()
+
+    def update_node(self, connection=None, timeout=None):
+        # Poll the miner, returns the change events against the previous state
+        self.fetch_summary(connection, timeout)
+        return self.diff()
+
+    def diff(self):
+        started = time.perf_counter()
+        snapshot = self.snapshot()
+        events = diff_snapshots(self.last_snapshot, snapshot)
+        self.last_snapshot = snapshot
+        diagnostics.record("diff", time.perf_counter() - started)
+        return events
 
-    def update_node(self):
+    def fetch_summary(self, connection=None, timeout=None):
+        started = time.perf_counter()
         try:
             url = f"http://{self.host}:{self.port}/2/summary"
-            response = requests.get(url)
+            if connection is not None:
+                response = connection.get(self.host, self.port, "/2/summary", timeout=timeout)
+            else:
+                response = requests.get(url, timeout=timeout)
+            received = time.perf_counter()
+            diagnostics.record("request", received - started)
+            diagnostics.record_node(self.id, received - started, response.status_code == 200)
             if response.status_code == 200:
-                res = response.json()
-
-                self.name = res.get("worker_id", "No Title")
+                for field, value in zip(SUMMARY_FIELDS, decode_summary(response.content)):
+                    setattr(self, field, value)
+                diagnostics.record("decode", time.perf_counter() - received)
                 self.online = True
                 self.success_count += 1
-                self.ua = res.get("ua", "Unknown")
-                self.uptime = res.get("uptime", 0)
-                self.algo = res.get("algo", "Unknown")
-                self.pool = res.get("connection", {}).get("pool", "Unknown")
-                self.ping = res.get("connection", {}).get("ping", 0)
-                self.failures = res.get("connection", {}).get("failures", 0)
-                self.difficulty = res.get("connection", {}).get("diff", 0)
-                self.hashrate_10s = res.get("hashrate", {}).get("total", [])[0]
-                self.hashrate_1m = res.get("hashrate", {}).get("total", [])[1]
-                self.hashrate_15m = res.get("hashrate", {}).get("total", [])[2]
-                self.highest_hashrate = res.get("hashrate", {}).get("highest", 0)
-                self.cpu_name = res.get("cpu", {}).get("brand", "Unknown")
-                self.cores = res.get("cpu", {}).get("cores", 0)
-                self.threads = res.get("cpu", {}).get("threads", 0)
-                self.memory_free = res.get("resources", {}).get("memory", {}).get("free", 0)
-                self.memory_total = res.get("resources", {}).get("memory", {}).get("total", 0)
-                self.shares_good = res.get("results", {}).get("shares_good", 0)
-                self.shares_total = res.get("results", {}).get("shares_total", 0)
-                self.avg_time = res.get("results", {}).get("avg_time", 0)
                 self.last_update = time.time()
                 print(f"{self.name} current hashrate: {self.hashrate_10s}, blocks or shares: {self.shares_good}/{self.shares_total}")
             else:
                 self.online = False
+                diagnostics.count("http_errors")
         except requests.RequestException:
             self.online = False
+            diagnostics.record_node(self.id, time.perf_counter() - started, False)
+            diagnostics.count("connection_errors")
             print(f"Failed to connect to {url}")
+        except ValueError as e:
+            self.online = False
+            diagnostics.count("invalid_payloads")
+            print(f"Invalid summary from {url}: {e}")
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "host": self.host,
-            "port": self.port,
-            "name": self.name,
-            "online": self.online,
-            "success_count": self.success_count,
-            "ua": self.ua,
-            "uptime": self.uptime,
-            "algo": self.algo,
-            "pool": self.pool,
-            "ping": self.ping,
-            "failures": self.failures,
-            "difficulty": self.difficulty,
-            "hashrate_10s": self.hashrate_10s,
-            "hashrate_1m": self.hashrate_1m,
-            "hashrate_15m": self.hashrate_15m,
-            "highest_hashrate": self.highest_hashrate,
-            "cpu_name": self.cpu_name,
-            "cores": self.cores,
-            "threads": self.threads,
-            "memory_free": self.memory_free,
-            "memory_total": self.memory_total,
-            "shares_good": self.shares_good,
-            "shares_total": self.shares_total,
-            "avg_time": self.avg_time
-        }
+        return dict(zip(NodeSnapshot._fields, node_fields(self)))
+
+    def snapshot(self):
+        return NodeSnapshot._make(node_fields(self))
 
 class NodeManager:
-    def __init__(self, filename):
+    def __init__(self, filename, max_in_flight=32, connect_timeout=3, read_timeout=5, history_dir=None, state_file=None, watch=False):
+        # filename is a config file, a directory of per-site config files, or a list of either
         self.filename = filename
+        primary = filename if isinstance(filename, str) else filename[0]
+        self.timeout = (connect_timeout, read_timeout)
+        # Bounded worker pool, caps the number of requests in flight during a sweep
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="poll")
+        self.config = FleetConfig(filename)
         self.nodes = self.load_nodes()
         if not self.nodes:
             print("Warning: No nodes were loaded. The node list is empty.")
+        # Node id -> node, kept in step with self.nodes by the node list edits below
+        self.by_id = {node.id: node for node in self.nodes}
+
+        # Shared keep-alive sessions and DNS cache for all nodes
+        self.connection = ConnectionPool(hosts=len(self.nodes))
+
+        # Hashrate history, kept next to the config file unless told otherwise
+        self.history = HistoryStore(history_dir or os.path.join(os.path.dirname(os.path.abspath(primary)), "history"))
+
+        # Last known state from the previous run, rows show it until their first poll
+        self.state = StateCache(state_file or f"{os.path.splitext(os.path.abspath(primary))[0]}.state")
+        self.stale = self.state.restore(self.nodes, self.history)
+
+        # Change events of every sweep are published here
+        self.events = EventBus()
+
+        # Fleet totals and group-by rollups, kept current by the change events
+        self.rollup = FleetRollup()
+        self.rollup.subscribe(self.events)
+        self.rollup.sync(self.nodes)
+
+        # Backend and thread detail, fetched lazily and cached per node
+        self.details = DetailCollector(self)
+        self.details.subscribe(self.events)
+
+        # Per-node poll schedule used by refresh_due
+        self.scheduler = PollScheduler()
+        self.scheduler.sync(self.nodes)
+
+        # Pick up edits other programs make to the config files
+        if watch:
+            self.config.start_watching()
 
     def load_nodes(self):
-        if not os.path.exists(self.filename) or os.stat(self.filename).st_size == 0:
-            print(f"File '{self.filename}' not found or is empty. Creating a new file.")
-            self.nodes = []
-            self.save_nodes()  # Create an empty nodes file if none exists
-            return []
-        
-        try:
-            with open(self.filename, "r") as file:
-                nodes = json.load(file).get("nodes", [])
-                if not nodes:
-                    print("Warning: Loaded nodes list is empty.")
-                input = []
-                for node in nodes:
-                    new_node = Node(id=node["id"], host=node["host"], port=node["port"])
-                    input.append(new_node)
-                return input
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading nodes: {e}")
-            return []
+        for path in self.config.files:
+            if not os.path.exists(path) or os.stat(path).st_size == 0:
+                print(f"File '{path}' not found or is empty. Creating a new file.")
+                self.config.create(path)  # Create an empty nodes file if none exists
+
+        # Ids come back unique across the fleet, table rows, the tree view, history and the state cache are keyed by them
+        nodes = self.config.load()
+        if not nodes:
+            print("Warning: Loaded nodes list is empty.")
+        return [Node(id=node_id, host=host, port=port) for node_id, host, port in nodes]
 
     def save_nodes(self):
-        out = []
-        for node in self.nodes:
-            result = { "id": node.id, "host": node.host, "port": node.port }
-            out.append(result)
-        
-        try:
-            with open(self.filename, "w") as file:
-                json.dump({"nodes": out}, file, indent=4)
-        except IOError as e:
-            print(f"Error saving nodes to file '{self.filename}': {e}")
+        # Written in the background once edits settle, only the files that changed
+        self.config.sync(self.nodes)
+
+    # Node list edits, keep the config files, rollups, schedule and detail cache in step
+
+    def add_node(self, host, port):
+        node = Node(id=self.config.add_node(host, port), host=host, port=port)
+        self.nodes.append(node)
+        self.by_id[node.id] = node
+        self.rollup.sync(self.nodes)
+        self.scheduler.sync(self.nodes)
+        return node
+
+    def edit_node(self, node, host, port):
+        node.host = host
+        node.port = port
+        self.config.update_node(node.id, host, port)
+        self.details.forget(node.id)
+        # The restored row belonged to the old address
+        self.stale.discard(node.id)
+        self.scheduler.poll_now(node.id)
+
+    def remove_node(self, node):
+        self.nodes.remove(node)
+        self.by_id.pop(node.id, None)
+        self.config.remove_node(node.id)
+        self.details.forget(node.id)
+        self.stale.discard(node.id)
+        diagnostics.forget_node(node.id)
+        self.rollup.sync(self.nodes)
+        self.scheduler.sync(self.nodes)
+
+    def apply_config_changes(self):
+        # Apply external config edits queued by the watcher, on the caller's thread.
+        # Returns (added nodes, removed node ids, changed nodes), untouched nodes keep their state.
+        added, removed, changed = [], [], []
+        while True:
+            try:
+                new, gone, moved = self.config.changes.get_nowait()
+            except queue.Empty:
+                break
+            for node_id, host, port in new:
+                if node_id not in self.by_id:
+                    node = self.by_id[node_id] = Node(id=node_id, host=host, port=port)
+                    self.nodes.append(node)
+                    added.append(node)
+            for node_id in gone:
+                node = self.by_id.pop(node_id, None)
+                if node is not None:
+                    self.nodes.remove(node)
+                    self.details.forget(node_id)
+                    self.stale.discard(node_id)
+                    diagnostics.forget_node(node_id)
+                    removed.append(node_id)
+            for node_id, host, port in moved:
+                node = self.by_id.get(node_id)
+                if node is not None:
+                    node.host = host
+                    node.port = port
+                    self.details.forget(node_id)
+                    self.stale.discard(node_id)
+                    self.scheduler.poll_now(node_id)
+                    changed.append(node)
+        if added or removed:
+            self.rollup.sync(self.nodes)
+            self.scheduler.sync(self.nodes)
+        return added, removed, changed
+
+    def close(self):
+        # Write what is pending and stop the background work, the manager is not used afterwards
+        self.config.stop()
+        self.state.close()
+        self.history.close()
+        self.executor.shutdown(wait=False)
+        self.connection.close()
 
     def refresh_node(self, index):
         try:
             index = int(index)
             if 0 <= index < len(self.nodes):
-                self.nodes[index].update_node()
+                self.events.publish(self.nodes[index].update_node(self.connection, self.timeout))
             else:
                 print(f"Error: Index {index} is out of bounds. Please provide a valid index between 0 and {len(self.nodes) - 1}.")
         except ValueError:
-            print(f"Error: Provided index '{index}' is not a valid integer.")
\ No newline at end of file
+            print(f"Error: Provided index '{index}' is not a valid integer.")
+
+    def refresh_all(self):
+        return self.poll(list(self.nodes))
+
+    def refresh_due(self):
+        # Poll only the nodes whose scheduled time has come, the schedule is kept in step by the node list edits
+        return self.poll([node for node in map(self.by_id.get, self.scheduler.due()) if node is not None])
+
+    def poll(self, nodes):
+        # Poll the given nodes concurrently, a sweep takes as long as the slowest host instead of the sum of all hosts
+        started = time.time()
+        self.connection.ensure_capacity(len(nodes))
+        futures = [self.executor.submit(node.update_node, self.connection, self.timeout) for node in nodes]
+        wait(futures)
+        events = []
+        for node, future in zip(nodes, futures):
+            if future.exception() is not None:
+                node.online = False
+                print(f"Error: Polling {node.host}:{node.port} failed: {future.exception()}")
+                events.extend(node.diff())
+            else:
+                events.extend(future.result())
+        marker = time.perf_counter()
+        self.history.record_sweep(nodes)
+        diagnostics.record("history", time.perf_counter() - marker)
+        # Node list edits sync the scheduler and rollups themselves, a sweep only touches the polled nodes
+        for node in nodes:
+            self.scheduler.completed(node)
+
+        marker = time.perf_counter()
+        self.events.publish(events)
+        diagnostics.record("publish", time.perf_counter() - marker)
+        diagnostics.record("sweep", time.time() - started)
+        diagnostics.count("polls", len(nodes))
+        diagnostics.count("events", len(events))
+        self.stale.difference_update(node.id for node in nodes)
+        self.state.schedule(self.nodes, self.history)
+
+        fleet = self.rollup.summary()
+        return {
+            "started": started,
+            "duration": time.time() - started,
+            "polled": len(nodes),
+            "polled_ids": [node.id for node in nodes],
+            "nodes": fleet["nodes"],
+            "online": fleet["online"],
+            "offline": fleet["offline"],
+            "changed": len({event.node_id for event in events}),
+            "connections": self.connection.stats()
+        }
@@ -0,0 +1,97 @@
+import threading
+
+from events import FieldsChanged
+
+# Running fleet totals and group-by rollups. Each node's last contribution is kept, so a change
+# only subtracts the old contribution and adds the new one: O(1) per node change, no fleet rescans.
+
+# Dimension name -> key function over a NodeSnapshot
+DIMENSIONS = {
+    "algo": lambda node: node.algo,
+    "pool": lambda node: node.pool,
+    "cpu": lambda node: node.cpu_name,
+    "version": lambda node: node.ua.split(" ")[0] if node.ua else "N/A"
+}
+
+# nodes, online, hashrate 10s / 1m / 15m, shares good, shares total
+METRICS = ("nodes", "online", "hashrate_10s", "hashrate_1m", "hashrate_15m", "shares_good", "shares_total")
+
+def contribution(node):
+    # Offline nodes count as nodes, but their last known hashrate does not
+    if node.online:
+        return (1, 1, node.hashrate_10s or 0, node.hashrate_1m or 0, node.hashrate_15m or 0, node.shares_good, node.shares_total)
+    return (1, 0, 0, 0, 0, node.shares_good, node.shares_total)
+
+def tidy(value):
+    # Repeated float add/subtract leaves residue in the last digits
+    return round(value, 2) if isinstance(value, float) else value
+
+class FleetRollup:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = [0] * len(METRICS)
+        # dimension -> group key -> totals
+        self.groups = {dimension: {} for dimension in DIMENSIONS}
+        # node id -> (contribution, group keys) last applied
+        self.applied = {}
+        self.version = 0
+
+    def subscribe(self, events):
+        events.subscribe(self.handle_events, [FieldsChanged])
+
+    def handle_events(self, events):
+        with self.lock:
+            for event in events:
+                self.apply(event.node_id, event.snapshot)
+
+    def sync(self, nodes):
+        # Pick up added nodes and drop removed ones, existing nodes are kept current by the change events
+        with self.lock:
+            ids = set()
+            for node in nodes:
+                ids.add(node.id)
+                if node.id not in self.applied:
+                    self.apply(node.id, node)
+            for node_id in set(self.applied) - ids:
+                self.apply(node_id, None)
+
+    def apply(self, node_id, node):
+        # Replace the node's previous contribution with the current one, node=None removes it
+        previous = self.applied.pop(node_id, None)
+        if previous is not None:
+            self.add(previous[0], previous[1], -1)
+        if node is not None:
+            current = (contribution(node), tuple(key(node) for key in DIMENSIONS.values()))
+            self.add(current[0], current[1], 1)
+            self.applied[node_id] = current
+        self.version += 1
+
+    def add(self, values, keys, sign):
+        for position, value in enumerate(values):
+            self.totals[position] += sign * value
+        for dimension, key in zip(DIMENSIONS, keys):
+            groups = self.groups[dimension]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [0] * len(METRICS)
+            for position, value in enumerate(values):
+                group[position] += sign * value
+            if not group[0]:
+                del groups[key]
+
+    # Queries, cheap enough to call on every frame
+
+    def summary(self):
+        with self.lock:
+            out = dict(zip(METRICS, map(tidy, self.totals)))
+        out["offline"] = out["nodes"] - out["online"]
+        return out
+
+    def breakdown(self, dimension):
+        # Groups of one dimension, highest 10s hashrate first
+        with self.lock:
+            groups = [dict(zip(METRICS, map(tidy, values)), key=key) for key, values in self.groups[dimension].items()]
+        return sorted(groups, key=lambda group: group["hashrate_10s"], reverse=True)
+
+    def to_dict(self):
+        return {"totals": self.summary(), "groups": {dimension: self.breakdown(dimension) for dimension in DIMENSIONS}}
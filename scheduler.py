@@ -0,0 +1,132 @@
+import random
+import threading
+import time
+
+# Per-node poll schedule: every node has its own next-due time. Failing hosts back off
+# exponentially with jitter, nodes with a moving hashrate are polled faster and stable
+# ones slower, and a token bucket keeps the whole fleet under a requests-per-second budget.
+
+class ScheduleEntry:
+    __slots__ = ("node_id", "next_due", "interval", "failures", "stable_polls", "last_hashrate", "last_polled", "polls", "deferred", "reason")
+
+    def __init__(self, node_id, next_due, interval):
+        self.node_id = node_id
+        self.next_due = next_due
+        self.interval = interval
+        self.failures = 0
+        self.stable_polls = 0
+        self.last_hashrate = None
+        self.last_polled = 0
+        self.polls = 0
+        self.deferred = 0
+        self.reason = "new node"
+
+class PollScheduler:
+    def __init__(self, base_interval=5, min_interval=2, max_interval=30, max_backoff=300, max_rps=100, change_threshold=0.05, jitter=0.2):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.max_rps = max_rps
+        self.change_threshold = change_threshold
+        self.jitter = jitter
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.tokens = max_rps
+        self.last_refill = time.monotonic()
+
+    def spread(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def sync(self, nodes, now=None):
+        # Add entries for new nodes (due right away) and drop the ones that were removed
+        now = now or time.monotonic()
+        with self.lock:
+            ids = set()
+            for node in nodes:
+                ids.add(node.id)
+                if node.id not in self.entries:
+                    self.entries[node.id] = ScheduleEntry(node.id, now, self.base_interval)
+            for node_id in set(self.entries) - ids:
+                del self.entries[node_id]
+
+    def poll_now(self, node_id):
+        with self.lock:
+            entry = self.entries.get(node_id)
+            if entry is not None:
+                entry.next_due = 0
+                entry.reason = "requested"
+
+    def due(self, now=None):
+        # Node ids to poll now, most overdue first, limited by the request budget
+        now = now or time.monotonic()
+        with self.lock:
+            # Holds at least one whole token, with max_rps below 1 a poll goes out every 1 / max_rps seconds
+            self.tokens = min(max(self.max_rps, 1), self.tokens + (now - self.last_refill) * self.max_rps)
+            self.last_refill = now
+
+            waiting = sorted((entry for entry in self.entries.values() if entry.next_due <= now), key=lambda entry: entry.next_due)
+            budget = int(self.tokens)
+            self.tokens -= min(budget, len(waiting))
+            for entry in waiting[budget:]:
+                entry.deferred += 1
+                entry.reason = "waiting for request budget"
+            return [entry.node_id for entry in waiting[:budget]]
+
+    def completed(self, node, now=None):
+        now = now or time.monotonic()
+        with self.lock:
+            entry = self.entries.get(node.id)
+            if entry is None:
+                return
+            entry.polls += 1
+            entry.last_polled = now
+
+            if not node.online:
+                entry.failures += 1
+                entry.stable_polls = 0
+                entry.interval = min(self.base_interval * 2 ** entry.failures, self.max_backoff)
+                entry.reason = f"offline, backing off after {entry.failures} failure(s)"
+            else:
+                hashrate = node.hashrate_10s or 0
+                if entry.failures or entry.last_hashrate is None:
+                    entry.interval = self.base_interval
+                    entry.stable_polls = 0
+                    entry.reason = "back online" if entry.failures else "online"
+                else:
+                    change = abs(hashrate - entry.last_hashrate) / max(entry.last_hashrate, 1)
+                    if change > self.change_threshold:
+                        entry.interval = self.min_interval
+                        entry.stable_polls = 0
+                        entry.reason = f"hashrate changing ({change:.0%})"
+                    else:
+                        entry.stable_polls += 1
+                        entry.interval = min(max(entry.interval, self.base_interval) * 1.5, self.max_interval)
+                        entry.reason = f"stable for {entry.stable_polls} poll(s)"
+                entry.failures = 0
+                entry.last_hashrate = hashrate
+
+            entry.next_due = now + self.spread(entry.interval)
+
+    def next_wakeup(self, now=None):
+        # Seconds until the earliest node is due
+        now = now or time.monotonic()
+        with self.lock:
+            if not self.entries:
+                return self.base_interval
+            return max(min(entry.next_due for entry in self.entries.values()) - now, 0)
+
+    def describe(self, now=None):
+        # Current schedule, soonest first, with the reason behind each node's interval
+        now = now or time.monotonic()
+        with self.lock:
+            return [{
+                "id": entry.node_id,
+                "due_in": round(max(entry.next_due - now, 0), 1),
+                "interval": round(entry.interval, 1),
+                "failures": entry.failures,
+                "polls": entry.polls,
+                "deferred": entry.deferred,
+                "last_polled_ago": round(now - entry.last_polled, 1) if entry.last_polled else None,
+                "reason": entry.reason
+            } for entry in sorted(self.entries.values(), key=lambda entry: entry.next_due)]
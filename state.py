@@ -0,0 +1,167 @@
+import atexit
+import mmap
+import os
+import struct
+import threading
+import time
+
+from history import RECORD
+
+# Warm-start cache: the last known state of every node plus its most recent raw hashrate samples,
+# so a restart shows real rows right away instead of "N/A" until the first sweep completes.
+#
+# Layout (little endian):
+#   header    magic, version, node count, string blob size, saved at
+#   nodes     one fixed-size NODE record per node
+#   samples   history.RECORD (timestamp, hashrate) x the sample count of each node, in node order
+#   strings   utf-8 blob, referenced from the node records by (offset, length)
+
+MAGIC = b"XMST"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIId")
+
+INT_FIELDS = ("id", "port", "success_count", "uptime", "ping", "failures", "difficulty", "cores", "threads",
+              "memory_free", "memory_total", "shares_good", "shares_total", "avg_time")
+FLOAT_FIELDS = ("hashrate_10s", "hashrate_1m", "hashrate_15m", "highest_hashrate", "last_update")
+TEXT_FIELDS = ("host", "name", "ua", "algo", "pool", "cpu_name")
+
+# ints, floats, online, (offset, length) per text field, sample count
+NODE = struct.Struct("<" + "q" * len(INT_FIELDS) + "d" * len(FLOAT_FIELDS) + "?" + "II" * len(TEXT_FIELDS) + "I")
+
+def encode_state(snapshots, samples, saved_at):
+    # snapshots: NodeSnapshots, samples: node id -> [(timestamp, hashrate), ...]
+    records = []
+    blob = bytearray()
+    history = []
+    for snapshot in snapshots:
+        text = []
+        for field in TEXT_FIELDS:
+            value = str(getattr(snapshot, field) or "").encode()
+            text += (len(blob), len(value))
+            blob += value
+        node_samples = samples.get(snapshot.id, ())
+        history.append(b"".join(RECORD.pack(*sample) for sample in node_samples))
+        records.append(NODE.pack(
+            *(int(getattr(snapshot, field) or 0) for field in INT_FIELDS),
+            *(float(getattr(snapshot, field) or 0) for field in FLOAT_FIELDS),
+            bool(snapshot.online), *text, len(node_samples)
+        ))
+    return b"".join([HEADER.pack(MAGIC, VERSION, len(records), len(blob), saved_at)] + records + history + [bytes(blob)])
+
+def decode_state(buffer):
+    # Returns (saved at, [(fields dict, samples), ...]), raises ValueError on a foreign or truncated file
+    if len(buffer) < HEADER.size:
+        raise ValueError("state file is truncated")
+    magic, version, count, blob_size, saved_at = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a state file of this version")
+    records = [NODE.unpack_from(buffer, HEADER.size + index * NODE.size) for index in range(count)]
+    sample_offset = HEADER.size + count * NODE.size
+    blob_offset = sample_offset + sum(record[-1] for record in records) * RECORD.size
+    if blob_offset + blob_size != len(buffer):
+        raise ValueError("state file is truncated")
+
+    out = []
+    texts = len(INT_FIELDS) + len(FLOAT_FIELDS) + 1
+    for record in records:
+        fields = dict(zip(INT_FIELDS + FLOAT_FIELDS, record))
+        fields["online"] = record[texts - 1]
+        for position, field in enumerate(TEXT_FIELDS):
+            offset, length = record[texts + 2 * position], record[texts + 2 * position + 1]
+            start = blob_offset + offset
+            fields[field] = bytes(buffer[start:start + length]).decode(errors="replace")
+        samples = [RECORD.unpack_from(buffer, sample_offset + index * RECORD.size) for index in range(record[-1])]
+        sample_offset += record[-1] * RECORD.size
+        out.append((fields, samples))
+    return saved_at, out
+
+class StateCache:
+    def __init__(self, path, debounce=30, samples=120):
+        self.path = path
+        # Seconds between a change and the write it triggers, later changes ride along
+        self.debounce = debounce
+        # Raw hashrate samples kept per node, older history stays in the segment files
+        self.samples = samples
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.timer = None
+        self.pending = None
+        self.saved_at = None
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def schedule(self, nodes, history=None):
+        # Called after every sweep, the write happens on a timer thread at most once per debounce
+        with self.lock:
+            self.pending = (nodes, history)
+            if self.timer is None:
+                self.timer = threading.Timer(self.debounce, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if pending is not None:
+            self.save(*pending)
+
+    def close(self):
+        # Final write, afterwards nothing keeps this cache alive until exit
+        atexit.unregister(self.flush)
+        self.flush()
+
+    def save(self, nodes, history=None):
+        # Snapshots only, so a poll running meanwhile never leaves a half-updated row behind
+        snapshots = [node.last_snapshot for node in list(nodes)]
+        samples = {}
+        if history is not None:
+            for snapshot in snapshots:
+                samples[snapshot.id] = history.recent_samples(snapshot.id, self.samples)
+        data = encode_state(snapshots, samples, time.time())
+
+        # Write next to the target and rename over it, readers see the old or the new file, never a mix
+        temporary = f"{self.path}.tmp"
+        with self.write_lock:
+            try:
+                with open(temporary, "wb") as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temporary, self.path)
+                self.writes += 1
+            except OSError as e:
+                print(f"Error writing state cache '{self.path}': {e}")
+
+    def load(self):
+        if not os.path.exists(self.path) or os.stat(self.path).st_size == 0:
+            return None, []
+        try:
+            with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return decode_state(buffer)
+        except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+            print(f"Ignoring state cache '{self.path}': {e}")
+            return None, []
+
+    def restore(self, nodes, history=None):
+        # Copy the saved state onto nodes whose id, host and port still match, returns the restored ids.
+        # Restored nodes stay offline: nothing was polled yet, rollups and the exporter must not count them as up.
+        saved_at, entries = self.load()
+        by_id = {node.id: node for node in nodes}
+        restored = set()
+        for fields, samples in entries:
+            node = by_id.get(fields["id"])
+            if node is None or node.host != fields["host"] or node.port != fields["port"]:
+                continue
+            for field, value in fields.items():
+                if field not in ("id", "host", "port", "online"):
+                    setattr(node, field, value)
+            if history is not None and samples:
+                node.hashrate = history.restore(node.id, samples)
+            node.last_snapshot = node.snapshot()
+            restored.add(node.id)
+        self.saved_at = saved_at
+        return restored
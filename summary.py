@@ -0,0 +1,59 @@
+import json
+
+# orjson is optional, it decodes the xmrig payloads several times faster than the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Node attributes filled from /2/summary, in the order decode_summary returns them
+SUMMARY_FIELDS = (
+    "name", "ua", "uptime", "algo", "pool", "ping", "failures", "difficulty",
+    "hashrate_10s", "hashrate_1m", "hashrate_15m", "highest_hashrate",
+    "cpu_name", "cores", "threads", "memory_free", "memory_total",
+    "shares_good", "shares_total", "avg_time"
+)
+
+EMPTY = {}
+
+def loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def decode_summary(body):
+    # Decode a /2/summary response body (bytes) and project only the fields Node uses.
+    # Missing or null sections fall back to the defaults, null hashrate windows become 0.
+    res = loads(body)
+    if not isinstance(res, dict):
+        raise ValueError("Summary payload is not a JSON object")
+
+    connection = res.get("connection") or EMPTY
+    hashrate = res.get("hashrate") or EMPTY
+    total = hashrate.get("total") or ()
+    cpu = res.get("cpu") or EMPTY
+    memory = (res.get("resources") or EMPTY).get("memory") or EMPTY
+    results = res.get("results") or EMPTY
+
+    return (
+        res.get("worker_id", "No Title"),
+        res.get("ua", "Unknown"),
+        res.get("uptime", 0),
+        res.get("algo", "Unknown"),
+        connection.get("pool", "Unknown"),
+        connection.get("ping", 0),
+        connection.get("failures", 0),
+        connection.get("diff", 0),
+        (total[0] if len(total) > 0 else 0) or 0,
+        (total[1] if len(total) > 1 else 0) or 0,
+        (total[2] if len(total) > 2 else 0) or 0,
+        hashrate.get("highest", 0) or 0,
+        cpu.get("brand", "Unknown"),
+        cpu.get("cores", 0),
+        cpu.get("threads", 0),
+        memory.get("free", 0),
+        memory.get("total", 0),
+        results.get("shares_good", 0),
+        results.get("shares_total", 0),
+        results.get("avg_time", 0)
+    )
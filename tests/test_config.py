@@ -0,0 +1,71 @@
+# Id merging, site prefixes and hot reload of the fleet configuration (config.py)
+import json
+import os
+
+from config import SITE_ID_SPAN, FleetConfig, site_prefix
+
+def write(path, nodes):
+    with open(path, "w") as file:
+        json.dump({"nodes": [{"id": node_id, "host": host, "port": port} for node_id, host, port in nodes]}, file)
+
+def read(path):
+    with open(path) as file:
+        return [(node["id"], node["host"], node["port"]) for node in json.load(file)["nodes"]]
+
+def test_single_file_keeps_ids(tmp_path):
+    path = str(tmp_path / "config.json")
+    write(path, [(2, "a.local", 8080), (7, "b.local", 8081)])
+    assert FleetConfig(path).load() == [(2, "a.local", 8080), (7, "b.local", 8081)]
+
+def test_duplicate_ids_are_renumbered_and_persisted(tmp_path):
+    path = str(tmp_path / "config.json")
+    write(path, [(2, "a.local", 8080), (3, "b.local", 8081), (3, "c.local", 8082)])
+    config = FleetConfig(path)
+
+    assert config.load() == [(2, "a.local", 8080), (3, "b.local", 8081), (4, "c.local", 8082)]
+    assert read(path) == [(2, "a.local", 8080), (3, "b.local", 8081), (4, "c.local", 8082)]
+
+    # Later writes keep every node
+    assert config.add_node("d.local", 8083) == 5
+    config.flush()
+    assert [host for _, host, _ in read(path)] == ["a.local", "b.local", "c.local", "d.local"]
+
+def test_sites_are_namespaced_and_stable(tmp_path):
+    sites = tmp_path / "sites"
+    sites.mkdir()
+    write(str(sites / "east.json"), [(1, "a.local", 8080), (1, "b.local", 8081), (SITE_ID_SPAN + 5, "c.local", 8082)])
+    write(str(sites / "west.json"), [(1, "d.local", 8080)])
+    # The same file given once more on its own is not loaded twice
+    nodes = FleetConfig([str(sites), str(sites / "west.json")]).load()
+
+    east, west = site_prefix("east") * SITE_ID_SPAN, site_prefix("west") * SITE_ID_SPAN
+    assert sorted(nodes) == sorted([(east + 1, "a.local", 8080), (east + 2, "b.local", 8081), (east + 3, "c.local", 8082), (west + 1, "d.local", 8080)])
+
+    # Another site showing up does not move anyone's id
+    write(str(sites / "north.json"), [(1, "e.local", 8080)])
+    again = FleetConfig(str(sites)).load()
+    assert set(nodes) < set(again)
+    assert len({node_id for node_id, _, _ in again}) == len(again)
+
+def test_reload_reports_changes_per_node(tmp_path):
+    path = str(tmp_path / "config.json")
+    write(path, [(1, "a.local", 8080), (2, "b.local", 8081), (3, "c.local", 8082)])
+    config = FleetConfig(path)
+    config.load()
+
+    # Edited by another program: one node moved, one removed, two added with a clashing id
+    write(path, [(1, "a.local", 8080), (2, "b.local", 9999), (4, "d.local", 8083), (4, "e.local", 8084)])
+    os.utime(path, ns=(0, 1))
+    config.check()
+    added, removed, changed = config.changes.get_nowait()
+
+    assert added == [(4, "d.local", 8083), (5, "e.local", 8084)]
+    assert removed == [3]
+    assert changed == [(2, "b.local", 9999)]
+    assert config.changes.empty()
+
+    # The renumbered id is written back, and our own write is not reported as another edit
+    config.flush()
+    assert read(path) == [(1, "a.local", 8080), (2, "b.local", 9999), (4, "d.local", 8083), (5, "e.local", 8084)]
+    config.check()
+    assert config.changes.empty()
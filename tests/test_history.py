@@ -0,0 +1,61 @@
+# Ring buffers, rollup tiers and the on-disk segments of the hashrate history (history.py)
+import os
+import time
+
+from history import TIERS, HistoryStore
+from nodes import Node
+
+# 400 raw samples 5 s apart, more than the raw ring holds, crossing a raw segment (day) boundary.
+# Recent enough that flush() does not clean them up as past retention.
+START = int(time.time()) // 86400 * 86400 - 17 * 60
+SAMPLES = [(START + 5 * index, 1000.0 + index) for index in range(400)]
+
+def record_all(store, samples=SAMPLES):
+    node = Node(id=7, host="a.local", port=8080)
+    for timestamp, value in samples:
+        node.hashrate_10s = value
+        store.record(node, timestamp)
+
+def minute_averages(samples):
+    # Complete 1m buckets only, the open one is not rolled up yet
+    buckets = {}
+    for timestamp, value in samples:
+        buckets.setdefault(timestamp - timestamp % 60, []).append(value)
+    starts = sorted(buckets)[:-1]
+    return [(start, sum(buckets[start]) / len(buckets[start])) for start in starts]
+
+def test_recent_range_is_served_from_the_ring(tmp_path):
+    directory = str(tmp_path / "history")
+    store = HistoryStore(directory, flush_interval=3600)
+    record_all(store)
+
+    start, end = SAMPLES[-50][0], SAMPLES[-1][0]
+    assert store.query(7, start, end, tier=0) == SAMPLES[-50:]
+    # Nothing had to be flushed to answer it
+    assert not os.path.exists(directory)
+
+def test_older_range_is_read_from_disk_across_segments(tmp_path):
+    directory = str(tmp_path / "history")
+    store = HistoryStore(directory, flush_interval=3600)
+    record_all(store)
+
+    # The ring lost the oldest samples, the query flushes and reads the segment files
+    assert len(store.series[7].rings[0]) < len(SAMPLES)
+    assert store.query(7, SAMPLES[0][0], SAMPLES[-1][0], tier=0) == SAMPLES
+    assert len(os.listdir(os.path.join(directory, "7", TIERS[0][0]))) == 2
+
+    # A fresh store has empty rings, a range in the middle goes through the binary search of each segment
+    reopened = HistoryStore(directory)
+    start, end = SAMPLES[150][0] + 1, SAMPLES[250][0]
+    assert reopened.query(7, start, end, tier=0) == SAMPLES[151:251]
+    assert reopened.query(7, SAMPLES[-1][0] + 1, SAMPLES[-1][0] + 100, tier=0) == []
+
+def test_minute_tier_rolls_up_averages(tmp_path):
+    directory = str(tmp_path / "history")
+    store = HistoryStore(directory, flush_interval=3600)
+    record_all(store)
+    expected = minute_averages(SAMPLES)
+
+    assert store.query(7, expected[0][0], expected[-1][0], tier=1) == expected
+    store.flush()
+    assert HistoryStore(directory).query(7, expected[0][0], expected[-1][0], tier=1) == expected
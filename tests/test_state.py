@@ -0,0 +1,70 @@
+# Round trip of the binary warm-start cache (state.py)
+from history import HistoryStore
+from nodes import Node
+from state import HEADER, StateCache, decode_state, encode_state
+
+def make_node(node_id, host, port, online=True):
+    node = Node(id=node_id, host=host, port=port)
+    node.name = f"rig-{node_id}"
+    node.online = online
+    node.ua = "XMRig/6.21.0 (Linux x86_64) libuv/1.44.2 gcc/12.2.0"
+    node.algo = "rx/0"
+    node.pool = "pool.example.org:3333"
+    node.cpu_name = "AMD Ryzen 9 7950X 16-Core Processor ünïcode"
+    node.uptime = 86400 + node_id
+    node.cores = 16
+    node.threads = 32
+    node.memory_total = 32 * 1024 ** 3
+    node.shares_good = 10 * node_id
+    node.shares_total = 10 * node_id + 1
+    node.hashrate_10s = 10000.5 + node_id
+    node.hashrate_15m = 9999.25
+    node.last_update = 1700000000.5
+    node.last_snapshot = node.snapshot()
+    return node
+
+def test_encode_decode_round_trip():
+    nodes = [make_node(1, "a.local", 8080), make_node(2, "b.local", 8081, online=False), make_node(3, "", 1)]
+    samples = {1: [(1700000000.0, 100.5), (1700000005.0, 101.5)], 3: [(1700000001.0, 7.0)]}
+    saved_at, entries = decode_state(encode_state([node.last_snapshot for node in nodes], samples, 1700000010.25))
+
+    assert saved_at == 1700000010.25
+    assert len(entries) == len(nodes)
+    for node, (fields, node_samples) in zip(nodes, entries):
+        for field, value in fields.items():
+            assert value == getattr(node, field), field
+        assert node_samples == samples.get(node.id, [])
+
+def test_decode_rejects_foreign_and_truncated_data():
+    data = encode_state([make_node(1, "a.local", 8080).last_snapshot], {1: [(1.0, 2.0)]}, 0)
+    for broken in (b"", data[:HEADER.size - 1], data[:-1], b"NOPE" + data[4:]):
+        try:
+            decode_state(broken)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {len(broken)} bytes of broken state")
+
+def test_cache_restores_matching_nodes_only(tmp_path):
+    history = HistoryStore(str(tmp_path / "history"))
+    saved = [make_node(1, "a.local", 8080), make_node(2, "b.local", 8081)]
+    for timestamp in (1700000000.0, 1700000005.0):
+        saved[0].last_update = timestamp
+        history.record(saved[0])
+    cache = StateCache(str(tmp_path / "config.state"))
+    cache.save(saved, history)
+
+    # Node 2 moved to another port since, its old state must not show up
+    fresh = [Node(id=1, host="a.local", port=8080), Node(id=2, host="b.local", port=9999)]
+    restored = StateCache(str(tmp_path / "config.state")).restore(fresh, HistoryStore(str(tmp_path / "history")))
+
+    assert restored == {1}
+    # Cached values come back, but a node only counts as up once it was polled again
+    assert fresh[0].last_snapshot == saved[0].last_snapshot._replace(online=False)
+    assert fresh[0].hashrate.recent() == [saved[0].hashrate_10s] * 2
+    assert fresh[1].name == "N/A"
+
+def test_cache_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "config.state"
+    path.write_bytes(b"XMST" + b"\0" * 40)
+    cache = StateCache(str(path))
+    assert cache.restore([Node(id=1, host="a.local", port=8080)]) == set()
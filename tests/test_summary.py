@@ -0,0 +1,59 @@
+# Projection of /2/summary payloads onto Node fields (summary.py), with and without orjson
+import glob
+import json
+import os
+
+import pytest
+
+import summary
+from summary import SUMMARY_FIELDS, decode_summary
+
+PAYLOADS = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "payloads", "summary_*.json")))
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(summary, "orjson", None)
+    elif summary.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+def decode(payload):
+    return dict(zip(SUMMARY_FIELDS, decode_summary(json.dumps(payload).encode())))
+
+@pytest.mark.parametrize("path", PAYLOADS)
+def test_recorded_payloads(backend, path):
+    with open(path, "rb") as file:
+        body = file.read()
+    raw = json.loads(body)
+    fields = dict(zip(SUMMARY_FIELDS, decode_summary(body)))
+    assert fields["name"] == raw["worker_id"]
+    assert fields["hashrate_10s"] == (raw["hashrate"]["total"][0] or 0)
+    assert fields["memory_total"] == raw["resources"]["memory"]["total"]
+    assert fields["shares_good"] == raw["results"]["shares_good"]
+
+@pytest.mark.parametrize("total, expected", [
+    ([None, None, None], (0, 0, 0)),
+    ([1234.5, None, None], (1234.5, 0, 0)),
+    ([1234.5], (1234.5, 0, 0)),
+    ([], (0, 0, 0)),
+    (None, (0, 0, 0))
+])
+def test_null_or_short_hashrate_windows(backend, total, expected):
+    fields = decode({"worker_id": "rig", "hashrate": {"total": total, "highest": None}})
+    assert (fields["hashrate_10s"], fields["hashrate_1m"], fields["hashrate_15m"]) == expected
+    assert fields["highest_hashrate"] == 0
+
+def test_missing_sections_fall_back_to_defaults(backend):
+    fields = decode({"worker_id": "rig", "connection": None})
+    assert fields["pool"] == "Unknown"
+    assert fields["ping"] == 0
+    assert fields["memory_free"] == 0
+    assert fields["memory_total"] == 0
+    assert fields["cpu_name"] == "Unknown"
+    assert fields["shares_total"] == 0
+
+@pytest.mark.parametrize("body", [b"[]", b"null", b"42", b'"summary"', b"{not json", b""])
+def test_non_object_payload_raises_value_error(backend, body):
+    with pytest.raises(ValueError):
+        decode_summary(body)
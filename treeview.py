@@ -0,0 +1,135 @@
+import tkinter as tk
+from tkinter import ttk, Menu
+
+from helper import *
+from details import detail_rows
+
+# Virtualized table: a ttk.Treeview only draws the rows inside the viewport and keeps
+# one lightweight item per node instead of ~15 widgets, so it scales to thousands of rigs.
+class NodeTreeView:
+    columns = [
+        ("status", "Status", 70),
+        ("name", "Name", 150),
+        ("host", "Host", 220),
+        ("hardware", "Hardware", 260),
+        ("memory", "Memory Free", 130),
+        ("hashrate", "Hashrate 10s / 1m / 15m", 200),
+        ("algo", "Algorithm", 90),
+        ("version", "Version", 110),
+        ("results", "Blocks or Shares", 120),
+        ("avg_time", "Avg Time", 160)
+    ]
+
+    def __init__(self, parent, on_edit, on_delete, on_expand=None):
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        # on_expand(node_id) asks for backend / thread detail when a row is opened
+        self.on_expand = on_expand
+        # Last values rendered per node id, rows are only touched when these change
+        self.rendered = {}
+        # Ids of rows restored from the state cache and not polled yet, set by the owner
+        self.stale = ()
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[column[0] for column in self.columns], show="tree headings", selectmode="browse")
+        self.tree.column("#0", width=30, stretch=False)
+        for column, title, width in self.columns:
+            self.tree.heading(column, text=title, anchor="w")
+            self.tree.column(column, width=width, anchor="w", stretch=False)
+        self.tree.tag_configure("offline", foreground="red")
+        self.tree.tag_configure("shares", foreground="green")
+        self.tree.tag_configure("cached", foreground="gray")
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        # Options: double click to edit, Delete key or context menu to remove
+        self.context_menu = Menu(self.tree, tearoff=0)
+        self.context_menu.add_command(label="Edit", command=lambda: self.call_selected(self.on_edit))
+        self.context_menu.add_command(label="Delete", command=lambda: self.call_selected(self.on_delete))
+        self.tree.bind("<Double-1>", lambda e: self.call_selected(self.on_edit))
+        self.tree.bind("<Delete>", lambda e: self.call_selected(self.on_delete))
+        self.tree.bind("<Button-3>", self.show_context_menu)
+        self.tree.bind("<<TreeviewOpen>>", self.expand_selected)
+
+    def show_context_menu(self, event):
+        row = self.tree.identify_row(event.y)
+        if row:
+            self.tree.selection_set(row)
+            self.context_menu.tk_popup(event.x_root, event.y_root)
+
+    def call_selected(self, callback):
+        selection = self.tree.selection()
+        if selection:
+            # Detail rows are children of their node, their iids start with the node id
+            callback(int(selection[0].split("/")[0]))
+
+    def expand_selected(self, event):
+        row = self.tree.focus()
+        if row and self.on_expand is not None and "/" not in row:
+            self.on_expand(int(row))
+
+    def show_details(self, node_id, details):
+        # Replace a node's child rows with one row per backend and per thread
+        iid = str(node_id)
+        if node_id not in self.rendered:
+            return
+        self.tree.delete(*self.tree.get_children(iid))
+        if details is None:
+            self.tree.insert(iid, "end", iid=f"{iid}/error", values=("", "Details unavailable"))
+            return
+        for index, (depth, label, hashrate, notes) in enumerate(detail_rows(details)):
+            # Same columns as the node row: name, hardware and hashrate
+            self.tree.insert(iid, "end", iid=f"{iid}/{index}", values=("", "  " * depth + label, "", notes, "", hashrate))
+
+    def row_values(self, node):
+        cached = not node.online and node.id in self.stale
+        values = (
+            "Online" if node.online else "Cached" if cached else "Offline",
+            node.name,
+            f"{node.host} : {node.port}",
+            f"{shorten_string(node.cpu_name, 25)} ({node.cores}C / {node.threads}T)",
+            f"{(node.memory_free/1024/1024/1024):.2f} / {(node.memory_total/1024/1024/1024):.2f} GB",
+            f"{node.hashrate_10s} / {node.hashrate_1m} / {node.hashrate_15m}",
+            node.algo,
+            shorten_string(node.ua, 15),
+            f"{node.shares_good}/{node.shares_total}",
+            seconds_to_string(node.avg_time)
+        )
+        if cached:
+            tags = ("cached",)
+        elif not node.online:
+            tags = ("offline",)
+        elif node.shares_good > 0:
+            tags = ("shares",)
+        else:
+            tags = ()
+        return values, tags
+
+    def load(self, nodes):
+        self.tree.delete(*self.tree.get_children())
+        self.rendered = {}
+        for node in nodes:
+            self.insert_node(node)
+
+    def insert_node(self, node):
+        values, tags = self.row_values(node)
+        self.tree.insert("", "end", iid=str(node.id), values=values, tags=tags)
+        # Placeholder child so the row can be expanded, replaced once the detail arrives
+        self.tree.insert(str(node.id), "end", iid=f"{node.id}/loading", values=("", "Loading details..."))
+        self.rendered[node.id] = (values, tags)
+
+    def update_node(self, node):
+        # node is either a Node or a NodeSnapshot
+        if node.id not in self.rendered:
+            return
+        row = self.row_values(node)
+        if self.rendered[node.id] != row:
+            self.tree.item(str(node.id), values=row[0], tags=row[1])
+            self.rendered[node.id] = row
+
+    def remove_node(self, node_id):
+        if self.rendered.pop(node_id, None) is not None:
+            self.tree.delete(str(node_id))